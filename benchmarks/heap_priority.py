@@ -0,0 +1,69 @@
+"""Heap push/pop throughput: orders compared with LimitOrder.__lt__ vs tuple keys.
+
+Run from the project root:
+
+    python -m benchmarks.heap_priority [count]
+"""
+import heapq
+import itertools
+import random
+import sys
+import time
+
+from core.orders import LimitOrder
+
+
+def make_orders(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        LimitOrder(order_id, rng.randint(9_900, 10_100), 10, "buy" if order_id % 2 else "sell", "BTC-USD")
+        for order_id in range(count)
+    ]
+
+
+def push_pop_orders(orders):
+    """Before: the heap holds the orders themselves and calls __lt__ on every compare"""
+    heaps = {"buy": [], "sell": []}
+    for order in orders:
+        heapq.heappush(heaps[order.order_side], order)
+    for heap in heaps.values():
+        while heap:
+            heapq.heappop(heap)
+
+
+def push_pop_keys(orders):
+    """After: the heap holds (price key, sequence, order) tuples, as HeapOrderBook does"""
+    heaps = {"buy": [], "sell": []}
+    sequence = itertools.count()
+    for order in orders:
+        if order.order_side == "buy":
+            heapq.heappush(heaps["buy"], (-order.price, next(sequence), order))
+        else:
+            heapq.heappush(heaps["sell"], (order.price, next(sequence), order))
+    for heap in heaps.values():
+        while heap:
+            heapq.heappop(heap)
+
+
+def best_of(function, orders, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(orders)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(count=200_000, repeat=3):
+    orders = make_orders(count)
+    results = {}
+    for name, function in (("order __lt__", push_pop_orders), ("tuple keys", push_pop_keys)):
+        elapsed = best_of(function, orders, repeat)
+        results[name] = count / elapsed
+        print(f"{name:<14}{elapsed:>10.3f}s {results[name]:>14,.0f} push+pop/s")
+    print(f"speedup       {results['tuple keys'] / results['order __lt__']:>10.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,50 @@
+"""Per object memory of the order and trade classes.
+
+Run from the project root:
+
+    python -m benchmarks.memory_orders [count]
+"""
+import sys
+import tracemalloc
+
+from core.orders import LimitOrder, MarketOrder, CompactLimitOrder, CompactMarketOrder
+from core.trades import Trade, CompactTrade
+
+
+def bytes_per_object(factory, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(index) for index in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list holding the objects is not part of their footprint
+    return (after - before - sys.getsizeof(objects)) / len(objects)
+
+
+def run(count=100_000):
+    sides = ("buy", "sell")
+    # Side and asset parsed from an input stream are fresh strings for every order
+    def side(index):
+        return "".join(sides[index % 2])
+
+    def asset():
+        return "".join(("BTC", "-USD"))
+
+    cases = [
+        ("LimitOrder", lambda i: LimitOrder(i, 100 + i % 50, 10, side(i), asset())),
+        ("CompactLimitOrder", lambda i: CompactLimitOrder(i, 100 + i % 50, 10, side(i), asset())),
+        ("MarketOrder", lambda i: MarketOrder(i, 10, side(i), asset())),
+        ("CompactMarketOrder", lambda i: CompactMarketOrder(i, 10, side(i), asset())),
+        ("Trade", lambda i: Trade(i, i + 1, 100 + i % 50, 10, asset())),
+        ("CompactTrade", lambda i: CompactTrade(i, i + 1, 100 + i % 50, 10, asset())),
+    ]
+
+    results = {name: bytes_per_object(factory, count) for name, factory in cases}
+    print(f"{'class':<20}{'bytes/object':>14}")
+    for name, size in results.items():
+        print(f"{name:<20}{size:>14.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,67 @@
+"""Throughput of ShardedMatchingEngine as workers are added, against one process.
+
+Run from the project root:
+
+    python -m benchmarks.sharding [orders] [max_workers]
+"""
+import logging
+import random
+import sys
+import time
+
+from core.engine import MatchingEngine
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orders import LimitOrder, MarketOrder
+from core.sharding import ShardedMatchingEngine
+from services.columnar_trade_manager import ColumnarTradeManager
+from utils.logger import logger
+
+
+def make_orders(count, symbols=200, seed=11):
+    rng = random.Random(seed)
+    assets = [f"SYM{index:03d}" for index in range(symbols)]
+    orders = []
+    for order_id in range(1, count + 1):
+        asset = rng.choice(assets)
+        side = rng.choice(("buy", "sell"))
+        if rng.random() < 0.1:
+            orders.append(("market", MarketOrder(order_id, rng.randint(1, 50), side, asset)))
+        else:
+            orders.append(("limit", LimitOrder(order_id, rng.randint(990, 1010), rng.randint(1, 10), side, asset)))
+    return orders
+
+
+def run(count=200_000, max_workers=4):
+    # Unfilled market orders warn, keep the terminal out of the timings
+    logger.setLevel(logging.ERROR)
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+
+    orders = make_orders(count)
+    start = time.perf_counter()
+    MatchingEngine(ColumnarTradeManager(), strategies).addOrders(orders)
+    elapsed = time.perf_counter() - start
+    results = {"single process": count / elapsed}
+    print(f"{'single process':<16}{count / elapsed:>14,.0f} orders/s")
+
+    workers = 1
+    while workers <= max_workers:
+        orders = make_orders(count)
+        with ShardedMatchingEngine(
+            workers, ColumnarTradeManager(), strategies, batch_size=4096, log_level=logging.ERROR
+        ) as engine:
+            start = time.perf_counter()
+            engine.addOrders(orders)
+            engine.drain()
+            elapsed = time.perf_counter() - start
+        name = f"{workers} worker(s)"
+        results[name] = count / elapsed
+        print(f"{name:<16}{count / elapsed:>14,.0f} orders/s")
+        workers *= 2
+    return results
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+    )
@@ -0,0 +1,212 @@
+"""Matching engine benchmark suite: throughput, per order latency and peak memory.
+
+Run from the project root:
+
+    python -m benchmarks.suite [--scale 1.0] [--output benchmark_results.json]
+
+Every workload is a deterministic list of (action, fields) operations, with
+action limit, market or cancel, replayed against HeapOrderBook books through
+MatchingEngine with LimitOrderMatching and MarketOrderMatching:
+
+    deep_book       passive orders spread over thousands of levels, a few crossing
+    cancel_heavy    a resting book where most operations then cancel a live order
+    market_sweeps   market orders each taking out many levels, then refilled
+    many_symbols    a random limit/market mix spread over a thousand assets
+
+Each workload runs twice on a fresh engine: once timed, recording the
+latency of every operation, and once under tracemalloc for peak memory,
+since tracing slows the interpreter too much to time under it. The JSON
+report carries the commit it was taken on, to compare runs across commits.
+"""
+import argparse
+import json
+import logging
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+
+from core.engine import MatchingEngine
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orders import LimitOrder, MarketOrder
+from services.trade_manager import DiscardTradeManager
+from utils.histogram import LatencyHistogram
+from utils.logger import logger
+
+MID = 10_000
+ASSET = "BTC-USD"
+
+
+def deep_book(count, levels=2_000, seed=1):
+    rng = random.Random(seed)
+    operations = []
+    for order_id in range(1, count + 1):
+        side = "buy" if order_id % 2 else "sell"
+        if rng.random() < 0.02:
+            # Crosses into the top few levels of the other side
+            price = MID + rng.randint(1, 5) if side == "buy" else MID - rng.randint(1, 5)
+        else:
+            offset = rng.randint(1, levels)
+            price = MID - offset if side == "buy" else MID + offset
+        operations.append(("limit", (order_id, price, rng.randint(1, 10), side, ASSET)))
+    return operations
+
+
+def cancel_heavy(count, cancel_share=0.7, seed=2):
+    """A quarter of the operations build the book, the rest cancel cancel_share of the time"""
+    rng = random.Random(seed)
+    operations = []
+    live = []
+    order_id = 0
+    for index in range(count):
+        if live and index >= count // 4 and rng.random() < cancel_share:
+            # Swap remove a random live order, the book never crosses so none fill
+            position = rng.randrange(len(live))
+            live[position], live[-1] = live[-1], live[position]
+            operations.append(("cancel", (ASSET, live.pop())))
+            continue
+        order_id += 1
+        side = rng.choice(("buy", "sell"))
+        offset = rng.randint(1, 200)
+        price = MID - offset if side == "buy" else MID + offset
+        operations.append(("limit", (order_id, price, rng.randint(1, 10), side, ASSET)))
+        live.append(order_id)
+    return operations
+
+
+def market_sweeps(count, levels=500, sweep_levels=20, seed=3):
+    """Random side sweeps of sweep_levels levels, each followed by the limits refilling them"""
+    rng = random.Random(seed)
+    operations = []
+    order_id = 0
+    # Price levels of each side, best first
+    prices = {"sell": range(MID + 1, MID + levels + 1), "buy": range(MID - 1, MID - levels - 1, -1)}
+    for side, side_prices in prices.items():
+        for price in side_prices:
+            order_id += 1
+            operations.append(("limit", (order_id, price, 10, side, ASSET)))
+
+    while len(operations) < count:
+        side = rng.choice(("buy", "sell"))
+        resting_side = "sell" if side == "buy" else "buy"
+        order_id += 1
+        operations.append(("market", (order_id, 10 * sweep_levels, side, ASSET)))
+        # The sweep took the best sweep_levels levels, put them back at the same prices
+        for price in prices[resting_side][:sweep_levels]:
+            order_id += 1
+            operations.append(("limit", (order_id, price, 10, resting_side, ASSET)))
+    return operations[:count]
+
+
+def many_symbols(count, symbols=1_000, seed=4):
+    rng = random.Random(seed)
+    assets = [f"SYM{index:04d}" for index in range(symbols)]
+    operations = []
+    for order_id in range(1, count + 1):
+        asset = rng.choice(assets)
+        side = rng.choice(("buy", "sell"))
+        if rng.random() < 0.1:
+            operations.append(("market", (order_id, rng.randint(1, 30), side, asset)))
+        else:
+            operations.append(("limit", (order_id, rng.randint(990, 1010), rng.randint(1, 10), side, asset)))
+    return operations
+
+
+WORKLOADS = {
+    "deep_book": deep_book,
+    "cancel_heavy": cancel_heavy,
+    "market_sweeps": market_sweeps,
+    "many_symbols": many_symbols,
+}
+
+
+def make_engine():
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    return MatchingEngine(DiscardTradeManager(), strategies)
+
+
+def play(engine, operations, latency=None):
+    """Apply the operations in order, recording each one's latency in ns when a histogram is given"""
+    clock = time.perf_counter_ns
+    add_order = engine.addOrder
+    remove_order = engine.removeOrder
+    for action, fields in operations:
+        # Orders are built outside the timed section, like an already decoded message
+        if action == "limit":
+            order = LimitOrder(*fields)
+        elif action == "market":
+            order = MarketOrder(*fields)
+        start = clock()
+        if action == "cancel":
+            remove_order(*fields)
+        else:
+            add_order(action, order)
+        if latency is not None:
+            latency.record(clock() - start)
+
+
+def run_workload(operations):
+    latency = LatencyHistogram()
+    play(make_engine(), operations, latency)
+
+    tracemalloc.start()
+    play(make_engine(), operations)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    elapsed = latency.total / 1e9
+    return {
+        "operations": len(operations),
+        "orders_per_s": len(operations) / elapsed if elapsed else 0,
+        "latency_ns": latency.summary(),
+        "peak_memory_bytes": peak,
+    }
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale=1.0, output="benchmark_results.json", workloads=tuple(WORKLOADS)):
+    # Unfilled market orders warn, keep the terminal out of the timings
+    level = logger.level
+    logger.setLevel(logging.ERROR)
+    try:
+        count = int(100_000 * scale)
+        results = {}
+        print(f"{'workload':<16}{'orders/s':>12}{'p50 ns':>10}{'p99 ns':>10}{'p99.9 ns':>10}{'peak MB':>10}")
+        for name in workloads:
+            result = results[name] = run_workload(WORKLOADS[name](count))
+            latency = result["latency_ns"]
+            print(
+                f"{name:<16}{result['orders_per_s']:>12,.0f}{latency['p50']:>10}{latency['p99']:>10}"
+                f"{latency['p99.9']:>10}{result['peak_memory_bytes'] / 2**20:>10.1f}"
+            )
+    finally:
+        logger.setLevel(level)
+
+    report = {
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "scale": scale,
+        "workloads": results,
+    }
+    if output:
+        with open(output, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplies the 100k operations per workload")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON report path, '' to skip it")
+    parser.add_argument("--workload", action="append", choices=sorted(WORKLOADS), help="Only run these workloads")
+    arguments = parser.parse_args()
+    run(arguments.scale, arguments.output, arguments.workload or tuple(WORKLOADS))
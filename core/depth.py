@@ -0,0 +1,161 @@
+import bisect
+from collections import namedtuple
+
+# Immutable view of the top levels; bids and asks are tuples of (price, quantity, order count), best first
+BookSnapshot = namedtuple("BookSnapshot", ["version", "bids", "asks"])
+
+# What a market order of some quantity would get: fillable quantity, its average
+# price, and the prices of the first and last level it reaches (None when nothing fills)
+FillEstimate = namedtuple("FillEstimate", ["quantity", "average_price", "best_price", "worst_price"])
+NO_FILL = FillEstimate(0, 0, None, None)
+
+
+class CumulativeDepth:
+    """Running quantity and ticks * quantity totals of one side, from the best level out.
+
+    Built lazily from an iterator of (ticks, price, quantity) levels, best
+    first: an estimate only extends the totals as far as its quantity
+    reaches. So the first estimate after the side changed costs O(levels it
+    reaches), like walking them, and later ones within what was already
+    built are one bisect, O(log levels). The iterator reads the live levels,
+    so an instance is only valid until its side changes; books drop it then.
+    """
+
+    __slots__ = ("prices", "ticks", "quantities", "notionals", "levels")
+
+    def __init__(self, levels):
+        self.prices = []
+        self.ticks = []
+        self.quantities = []  # Total quantity of this level and every better one
+        self.notionals = []  # Same for ticks * quantity
+        self.levels = iter(levels)  # Levels not summed yet, None once all are
+
+    def _extend(self, quantity):
+        """Sum levels until their total reaches quantity or the side runs out"""
+        quantities = self.quantities
+        quantity_total = quantities[-1] if quantities else 0
+        notional_total = self.notionals[-1] if quantities else 0
+        while quantity_total < quantity:
+            level = next(self.levels, None)
+            if level is None:
+                self.levels = None
+                return
+            ticks, price, level_quantity = level
+            quantity_total += level_quantity
+            notional_total += ticks * level_quantity
+            self.prices.append(price)
+            self.ticks.append(ticks)
+            quantities.append(quantity_total)
+            self.notionals.append(notional_total)
+
+    def estimate(self, quantity, price_grid):
+        quantities = self.quantities
+        if self.levels is not None and (not quantities or quantities[-1] < quantity):
+            self._extend(quantity)
+        if not quantities or quantity <= 0:
+            return NO_FILL
+        index = bisect.bisect_left(quantities, quantity)
+        if index == len(quantities):
+            # Not enough liquidity, the whole side fills
+            index -= 1
+            filled = quantities[index]
+            notional = self.notionals[index]
+        else:
+            filled = quantity
+            if index:
+                notional = self.notionals[index - 1] + (quantity - quantities[index - 1]) * self.ticks[index]
+            else:
+                notional = quantity * self.ticks[0]
+        return FillEstimate(filled, price_grid.average_price(notional, filled), self.prices[0], self.prices[index])
+
+
+class DepthCache:
+    """Aggregated price levels of a book, updated by the book on every change.
+
+    Each side keeps ticks -> [price, quantity, order count, hidden quantity]
+    plus a sorted list of level keys with the best level last. Snapshots only
+    show the visible part; fill estimates count the icebergs' hidden quantity
+    too, since it refills at the same price. The version only moves when one
+    of the top (depth) levels changes, and the snapshot is rebuilt at most
+    once per version, in O(depth), so pollers that see the same version can
+    skip their work entirely.
+    """
+
+    def __init__(self, depth: int = 10):
+        self.depth = depth
+        self.levels = {"buy": {}, "sell": {}}
+        self.level_keys = {"buy": [], "sell": []}
+        self.version = 0
+        self._snapshot = BookSnapshot(0, (), ())
+        self._cumulative = {"buy": None, "sell": None}  # CumulativeDepth per side, None once stale
+
+    def add(self, order_side, ticks, price, quantity, hidden=0):
+        """A new order rests at ticks"""
+        self._cumulative[order_side] = None
+        level = self.levels[order_side].get(ticks)
+        key = ticks if order_side == "buy" else -ticks
+        if level is None:
+            self.levels[order_side][ticks] = [price, quantity, 1, hidden]
+            bisect.insort(self.level_keys[order_side], key)
+        else:
+            level[1] += quantity
+            level[2] += 1
+            level[3] += hidden
+        if self._inDepth(order_side, key):
+            self.version += 1
+
+    def reduce(self, order_side, ticks, quantity, removed: bool, hidden=0):
+        """An order at ticks lost quantity (and hidden quantity), removed when it left the book"""
+        self._cumulative[order_side] = None
+        level = self.levels[order_side][ticks]
+        key = ticks if order_side == "buy" else -ticks
+        in_depth = self._inDepth(order_side, key)
+        level[1] -= quantity
+        level[3] -= hidden
+        if removed:
+            level[2] -= 1
+            if not level[2]:
+                del self.levels[order_side][ticks]
+                keys = self.level_keys[order_side]
+                del keys[bisect.bisect_left(keys, key)]
+        if in_depth:
+            self.version += 1
+
+    def refill(self, order_side, ticks, quantity):
+        """An iceberg at ticks showed quantity more of its hidden quantity"""
+        self._cumulative[order_side] = None
+        level = self.levels[order_side][ticks]
+        level[1] += quantity
+        level[3] -= quantity
+        if self._inDepth(order_side, ticks if order_side == "buy" else -ticks):
+            self.version += 1
+
+    def cumulative(self, order_side):
+        """CumulativeDepth of one side, started over only if the side changed since the last call"""
+        cumulative = self._cumulative[order_side]
+        if cumulative is None:
+            levels = self.levels[order_side]
+            sign = 1 if order_side == "buy" else -1
+            cumulative = self._cumulative[order_side] = CumulativeDepth(
+                (ticks, level[0], level[1] + level[3])
+                for ticks, level in ((sign * key, levels[sign * key]) for key in reversed(self.level_keys[order_side]))
+            )
+        return cumulative
+
+    def _inDepth(self, order_side, key):
+        keys = self.level_keys[order_side]
+        return len(keys) - bisect.bisect_left(keys, key) <= self.depth
+
+    def snapshot(self):
+        if self._snapshot.version != self.version:
+            self._snapshot = BookSnapshot(self.version, self._side("buy"), self._side("sell"))
+        return self._snapshot
+
+    def _side(self, order_side):
+        if not self.depth:
+            return ()
+        levels = self.levels[order_side]
+        sign = 1 if order_side == "buy" else -1
+        return tuple(
+            tuple(levels[sign * key][:3]) for key in reversed(self.level_keys[order_side][-self.depth:])
+        )
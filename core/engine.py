@@ -0,0 +1,81 @@
+from itertools import groupby
+from core.factory import OrderFactory
+from core.interfaces import TradeManagerInterface, MatchingStrategy
+from core.orderbook import HeapOrderBook
+
+
+class MatchingEngine:
+    """Routes orders to one order book per asset.
+
+    Books are created the first time an order for their asset arrives, so
+    only active symbols cost memory. All books share the same strategies and
+    trade manager, which gets the trades of every asset in execution order.
+    A MarketDataFeed tracks the levels of one book and its events carry no
+    asset, so feeds are given per asset with configureAsset, never shared.
+    """
+
+    def __init__(
+        self,
+        trade_manager: TradeManagerInterface,
+        strategies: dict[str, MatchingStrategy],
+        book_class=HeapOrderBook,
+        **book_options,
+    ):
+        if book_options.get("market_data") is not None:
+            raise ValueError("A market data feed belongs to one book, set it per asset with configureAsset")
+        self.trade_manager = trade_manager
+        self.strategies = strategies
+        self.book_class = book_class
+        self.book_options = book_options  # Passed to every book, e.g. log_mode
+        self.asset_options = {}  # Per asset overrides, e.g. tick_size
+        self.books = {}
+
+    def configureAsset(self, asset, **book_options):
+        """Book options for one asset, used when its book is created"""
+        if asset in self.books:
+            raise ValueError(f"Book for asset: '{asset}' already created")
+        feed = book_options.get("market_data")
+        if feed is not None and any(
+            options.get("market_data") is feed for other, options in self.asset_options.items() if other != asset
+        ):
+            raise ValueError("A market data feed belongs to one book, give each asset its own")
+        self.asset_options[asset] = book_options
+
+    def getBook(self, asset):
+        book = self.books.get(asset)
+        if book is None:
+            options = {**self.book_options, **self.asset_options.get(asset, {})}
+            book = self.books[asset] = self.book_class(
+                asset, self.trade_manager, self.strategies, **options
+            )
+        return book
+
+    def addOrder(self, order_type, order):
+        self.getBook(order.asset).addOrder(order_type, order)
+
+    def submitOrder(self, order_type, **order_fields):
+        """Create an order through OrderFactory and route it to its book"""
+        order = OrderFactory.create_order(order_type, **order_fields)
+        self.addOrder(order_type, order)
+        return order
+
+    def addOrders(self, orders):
+        """Route a stream of (order_type, order) pairs and return the trades they produced.
+
+        Consecutive orders for the same asset go to their book as one batch,
+        so the global order of the stream is kept.
+        """
+        trades = []
+        for asset, run in groupby(orders, key=lambda item: item[1].asset):
+            trades.extend(self.getBook(asset).addOrders(run))
+        return trades
+
+    def removeOrder(self, asset, order_id: int):
+        book = self.books.get(asset)
+        if book is not None:
+            book.removeOrder(order_id)
+
+    def modifyOrder(self, asset, order_id: int, new_quantity: int, new_price=None):
+        book = self.books.get(asset)
+        if book is not None:
+            return book.modifyOrder(order_id, new_quantity, new_price)
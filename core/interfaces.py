@@ -6,6 +6,11 @@ class TradeStorage(ABC):
     def record_trade(self,trade):
         pass
 
+    def record_trades(self, trades):
+        """Record a batch of trades in order; override when a batch is cheaper than a loop"""
+        for trade in trades:
+            self.record_trade(trade)
+
 class TradeHistory(ABC):
 
     @abstractmethod
@@ -25,6 +30,10 @@ class OrderBookInterface(ABC):
     def removeOrder(self, order_id: int) -> None:
         pass
 
+    @abstractmethod
+    def modifyOrder(self, order_id: int, new_quantity: int, new_price=None):
+        pass
+
     @abstractmethod
     def cleanHeap(self) -> None:
         pass
@@ -53,6 +62,36 @@ class OrderBookInterface(ABC):
     def listBid(self, depth: int) -> None:
         pass
 
+    # Primitives used by the matching strategies, so they work with any book engine
+
+    @abstractmethod
+    def restOrder(self, order) -> None:
+        pass
+
+    @abstractmethod
+    def bestOrder(self, order_side: str):
+        pass
+
+    @abstractmethod
+    def fillOrder(self, order, quantity: int) -> None:
+        pass
+
+    @abstractmethod
+    def recordTrade(self, trade) -> None:
+        pass
+
+    @abstractmethod
+    def sweepOrders(self, order_side: str, quantity: int, make_trade):
+        pass
+
+    @abstractmethod
+    def fillableQuantity(self, order_side: str, limit_ticks, quantity: int) -> int:
+        pass
+
+    @abstractmethod
+    def addStop(self, order) -> None:
+        pass
+
 class MatchingStrategy(ABC):
     @abstractmethod
     def match(self, orderbook, new_order):
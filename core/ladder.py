@@ -0,0 +1,473 @@
+from utils.logger import logger, request_log_mode
+from core.interfaces import OrderBookInterface, TradeManagerInterface, MatchingStrategy
+from core.orders import LimitOrder, IcebergOrder
+from core.ticks import PriceGrid
+from core.depth import CumulativeDepth
+from core.triggers import StopIndex
+from collections import deque
+import bisect
+import copy
+from utils.helpers import print_line
+
+
+class PriceLevel:
+    """All resting orders at one price, in time priority (FIFO)"""
+
+    __slots__ = ("price", "ticks", "orders", "quantity", "count", "hidden")
+
+    def __init__(self, price, ticks):
+        self.price = price
+        self.ticks = ticks
+        self.orders = deque()
+        self.quantity = 0  # Aggregate live quantity at this price
+        self.count = 0  # Live orders at this price
+        self.hidden = 0  # Quantity held back by icebergs, not part of quantity
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} price={self.price}, qty={self.quantity}, orders={self.count}>"
+
+
+class LadderOrderBook(OrderBookInterface):
+    """Order book kept as a sorted ladder of price levels.
+
+    Each side keeps a dict of price ticks -> PriceLevel plus a sorted list of level
+    keys with the best level at the end, so the top of book is O(1), a cancel
+    by id is O(1) amortized, and depth queries only touch the levels they show.
+    """
+
+    def __init__(
+        self,
+        asset,
+        trade_manager: TradeManagerInterface,
+        strategies: dict[str, MatchingStrategy],
+        log_mode: str | None = None,
+        tick_size: float | None = None,
+        lot_size: int | None = None,
+    ):
+        if log_mode is not None:
+            # Process wide: "queue" turns queue logging on for every book, "sync" leaves it as it is
+            request_log_mode(log_mode)
+        self.asset = asset
+        self.trade_manager = trade_manager
+        self.strategies = strategies
+        self.price_grid = PriceGrid(tick_size, lot_size)
+        self.order_map = {}  # Resting orders by ID
+        self.levels = {"buy": {}, "sell": {}}
+        # Sort keys (ticks for bids, -ticks for asks), ascending, best level last
+        self.level_keys = {"buy": [], "sell": []}
+        self._batch_trades = None  # Set while addOrders runs, collects the trades it produces
+        self._cumulative = {"buy": None, "sell": None}  # CumulativeDepth per side, None once stale
+        self.stops = StopIndex()  # Stop orders waiting for their trigger price
+        self.last_trade_price = None
+
+    def addOrder(self, order_type, order):
+
+        if order.asset != self.asset:
+            raise ValueError(f"Order asset: '{order.asset}' does not match book asset '{self.asset}'")
+        self.price_grid.check_quantity(order.quantity)
+        if isinstance(order, LimitOrder):
+            self.restOrder(order)
+
+        if order_type in self.strategies:
+            logger.info("Placing order %s: %s", order_type, order)
+            print_line()
+            self.strategies[order_type].match(self, order)
+            if self.stops.orders and self.last_trade_price != self.stops.last_price:
+                self.stops.release(self)
+
+    def addOrders(self, orders, trades=None):
+        """Add a stream of (order_type, order) pairs and return the trades they produced.
+
+        Matches exactly like calling addOrder in a loop, without its per order
+        logging. Pass a trades list to collect into it, to keep the trades
+        made before an order raises.
+        """
+        trades = self._batch_trades = [] if trades is None else trades
+        strategies = self.strategies
+        rest_order = self.restOrder
+        check_quantity = self.price_grid.check_quantity
+        asset = self.asset
+        stops = self.stops
+        try:
+            for order_type, order in orders:
+                if order.asset != asset:
+                    raise ValueError(f"Order asset: '{order.asset}' does not match book asset '{asset}'")
+                check_quantity(order.quantity)
+                if isinstance(order, LimitOrder):
+                    rest_order(order)
+                strategy = strategies.get(order_type)
+                if strategy is not None:
+                    strategy.match(self, order)
+                    if stops.orders and self.last_trade_price != stops.last_price:
+                        stops.release(self)
+        finally:
+            self._batch_trades = None
+        return trades
+
+    def removeOrder(self, order_id: int):
+        order = self.order_map.pop(order_id, None)
+        if order is None:
+            self.stops.remove(order_id)
+            return
+        level = self.levels[order.order_side][order.price_ticks]
+        level.quantity -= order.quantity
+        level.count -= 1
+        order.quantity = 0
+        if order.hidden_quantity:
+            level.hidden -= order.hidden_quantity
+            order.hidden_quantity = 0
+        self._cumulative[order.order_side] = None
+        self._purgeLevel(order.order_side, level)
+
+    def modifyOrder(self, order_id: int, new_quantity: int, new_price=None):
+        """Amend a resting order, returning it as it now rests (None once gone).
+
+        Lowering the quantity at the same price keeps the order's place in its
+        level; a new price or a larger quantity requeues an amended copy at
+        the back of its level and matches it. A quantity of 0 cancels it.
+        For an IcebergOrder new_quantity is its total, visible plus hidden,
+        and a cut comes off the hidden quantity first.
+        """
+        if new_quantity < 0:
+            raise ValueError("Quantity must not be negative!")
+        order = self.order_map.get(order_id)
+        if order is None:
+            return None
+        if new_quantity == 0:
+            self.removeOrder(order_id)
+            return None
+        self.price_grid.check_quantity(new_quantity)
+
+        same_price = new_price is None or self.price_grid.to_ticks(new_price) == order.price_ticks
+        if same_price and new_quantity <= order.quantity + order.hidden_quantity:
+            level = self.levels[order.order_side][order.price_ticks]
+            reduced = order.quantity + order.hidden_quantity - new_quantity
+            if order.hidden_quantity and reduced:
+                hidden_cut = min(reduced, order.hidden_quantity)
+                order.hidden_quantity -= hidden_cut
+                level.hidden -= hidden_cut
+                reduced -= hidden_cut
+            level.quantity -= reduced
+            self._cumulative[order.order_side] = None
+            order.quantity -= reduced
+            return order
+
+        # The requeued order may cross, without a strategy to match it the book would stay crossed
+        strategy = self.strategies.get("limit")
+        if strategy is None:
+            raise ValueError("Book has no 'limit' strategy to match an amended order")
+        amended = copy.copy(order)
+        if isinstance(amended, IcebergOrder):
+            amended.quantity = min(amended.display_quantity, new_quantity)
+            amended.hidden_quantity = new_quantity - amended.quantity
+        else:
+            amended.quantity = new_quantity
+        if not same_price:
+            amended.price = new_price
+        self.removeOrder(order_id)
+        self.restOrder(amended)
+        strategy.match(self, amended)
+        if self.stops.orders and self.last_trade_price != self.stops.last_price:
+            self.stops.release(self)
+        return amended if amended.quantity > 0 else None
+
+    def cleanHeap(self):
+        """Nothing to clean: levels drop dead orders as soon as they reach the front"""
+
+    def restOrder(self, order):
+        """Append a limit order to the back of its price level, without matching it"""
+        order.price_ticks = ticks = self.price_grid.to_ticks(order.price)
+        side = order.order_side
+        levels = self.levels[side]
+        level = levels.get(ticks)
+        if level is None:
+            level = levels[ticks] = PriceLevel(order.price, ticks)
+            bisect.insort(self.level_keys[side], self._levelKey(side, ticks))
+        level.orders.append(order)
+        level.quantity += order.quantity
+        level.hidden += order.hidden_quantity
+        level.count += 1
+        self.order_map[order.order_id] = order
+        self._cumulative[side] = None
+
+    def addStop(self, order):
+        """Hold a stop order off the book until a trade reaches its stop price"""
+        order.stop_ticks = self.price_grid.to_ticks(order.stop_price)
+        self.stops.add(order)
+
+    def fillableQuantity(self, order_side: str, limit_ticks, quantity: int):
+        """Quantity, up to quantity, resting on order_side at limit_ticks or better, summed by level"""
+        levels = self.levels[order_side]
+        total = 0
+        for key in reversed(self.level_keys[order_side]):
+            ticks = self._levelTicks(order_side, key)
+            if total >= quantity or (ticks < limit_ticks if order_side == "buy" else ticks > limit_ticks):
+                break
+            total += levels[ticks].quantity + levels[ticks].hidden
+        return min(total, quantity)
+
+    def bestOrder(self, order_side: str):
+        """Oldest order at the best price on the given side, or None"""
+        level = self.bestLevel(order_side)
+        return level.orders[0] if level else None
+
+    def fillOrder(self, order, quantity: int):
+        """Reduce a resting order by a traded quantity, dropping it once fully filled"""
+        level = self.levels[order.order_side][order.price_ticks]
+        order.quantity -= quantity
+        level.quantity -= quantity
+        self._cumulative[order.order_side] = None
+        if order.quantity == 0:
+            if order.hidden_quantity:
+                self._replenish(level, order)
+                return
+            self.order_map.pop(order.order_id, None)
+            level.count -= 1
+            self._purgeLevel(order.order_side, level)
+
+    def recordTrade(self, trade):
+        self.last_trade_price = trade.execution_price
+        self.trade_manager.record_trade(trade)
+        if self._batch_trades is not None:
+            self._batch_trades.append(trade)
+
+    def sweepOrders(self, order_side: str, quantity: int, make_trade):
+        """Take up to quantity from the best levels of one side in a single pass.
+
+        A cumulative sum over the level quantities finds the levels the sweep
+        takes out entirely; their orders are all filled and the levels are
+        dropped with one slice of the key list. The next level, where the
+        sweep ends or an iceberg refills, is filled order by order. Fills,
+        make_trade calls and the returned (filled quantity, price ticks *
+        quantity) match HeapOrderBook.sweepOrders.
+        """
+        levels = self.levels[order_side]
+        keys = self.level_keys[order_side]
+        order_map = self.order_map
+        level_ticks = self._levelTicks
+        trades = []
+        remaining = quantity
+        tick_volume = 0
+        self._cumulative[order_side] = None
+
+        while remaining and keys:
+            cleared = 0
+            for key in reversed(keys):
+                level = levels[level_ticks(order_side, key)]
+                # Icebergs refill behind the rest of their level, those levels are walked below
+                if level.quantity > remaining or level.hidden:
+                    break
+                remaining -= level.quantity
+                cleared += 1
+            if cleared:
+                for key in keys[-cleared:][::-1]:
+                    level = levels.pop(level_ticks(order_side, key))
+                    for order in level.orders:
+                        if order.quantity:
+                            trades.append(make_trade(order, order.quantity))
+                            tick_volume += order.quantity * level.ticks
+                            order_map.pop(order.order_id, None)
+                            order.quantity = 0
+                del keys[-cleared:]
+            if not remaining or not keys:
+                break
+
+            level = levels[level_ticks(order_side, keys[-1])]
+            orders = level.orders
+            while remaining and level.count:
+                order = orders[0]
+                if order.quantity == 0:
+                    orders.popleft()
+                    continue
+                traded = remaining if remaining < order.quantity else order.quantity
+                trades.append(make_trade(order, traded))
+                remaining -= traded
+                tick_volume += traded * level.ticks
+                order.quantity -= traded
+                level.quantity -= traded
+                if order.quantity == 0:
+                    if order.hidden_quantity:
+                        self._replenish(level, order)
+                    else:
+                        order_map.pop(order.order_id, None)
+                        level.count -= 1
+                        orders.popleft()
+            self._purgeLevel(order_side, level)
+
+        if trades:
+            self.last_trade_price = trades[-1].execution_price
+            self.trade_manager.record_trades(trades)
+            if self._batch_trades is not None:
+                self._batch_trades.extend(trades)
+        return quantity - remaining, tick_volume
+
+    def bestLevel(self, order_side: str):
+        """Best PriceLevel on the given side, or None if that side is empty"""
+        keys = self.level_keys[order_side]
+        if not keys:
+            return None
+        return self.levels[order_side][self._levelTicks(order_side, keys[-1])]
+
+    def estimateFill(self, order_side: str, quantity: int):
+        """FillEstimate of a market order of this side and quantity, without touching the book.
+
+        Running totals over the levels are summed again after the other side
+        changed, only as far as the quantity reaches, so a check costs
+        O(levels reached) after a change and O(log levels) between changes.
+        """
+        return self._cumulativeDepth(self._oppositeSide(order_side)).estimate(quantity, self.price_grid)
+
+    def estimateFills(self, order_side: str, quantities):
+        """estimateFill for many quantities against the same book"""
+        cumulative = self._cumulativeDepth(self._oppositeSide(order_side))
+        return [cumulative.estimate(quantity, self.price_grid) for quantity in quantities]
+
+    def _cumulativeDepth(self, order_side):
+        cumulative = self._cumulative[order_side]
+        if cumulative is None:
+            levels = self.levels[order_side]
+            cumulative = self._cumulative[order_side] = CumulativeDepth(
+                (level.ticks, level.price, level.quantity + level.hidden)
+                for level in (levels[self._levelTicks(order_side, key)] for key in reversed(self.level_keys[order_side]))
+            )
+        return cumulative
+
+    def getDepth(self, order_side: str, depth: int):
+        """Aggregated (price, quantity, order count) for the first (depth) levels"""
+        if depth <= 0:
+            return []
+        levels = self.levels[order_side]
+        depth_levels = []
+        for key in reversed(self.level_keys[order_side][-depth:]):
+            level = levels[self._levelTicks(order_side, key)]
+            depth_levels.append((level.price, level.quantity, level.count))
+        return depth_levels
+
+    def getAskOrder(self):
+        order = self.bestOrder("sell")
+        if order is not None:
+            logger.info(f"Ask order: {order}")
+            print_line()
+            return order
+        else:
+            logger.info("Ask Book is empty.")
+            print_line()
+
+    def getBidOrder(self):
+        order = self.bestOrder("buy")
+        if order is not None:
+            logger.info(f"Bid order: {order}")
+            print_line()
+            return order
+        else:
+            logger.info("Bid Book is empty.")
+            print_line()
+
+    def getAsk(self):
+        level = self.bestLevel("sell")
+        if level is not None:
+            logger.info(f"Ask: {level.price}")
+            print_line()
+            return level.price
+        else:
+            logger.info("Ask Book is empty.")
+            print_line()
+
+    def getBid(self):
+        level = self.bestLevel("buy")
+        if level is not None:
+            logger.info(f"Bid: {level.price}")
+            print_line()
+            return level.price
+        else:
+            logger.info("Bid Book is empty.")
+            print_line()
+
+    def listAsk(self, depth: int):
+        """List first (depth) orders in the Ask order book"""
+        asks = self._firstOrders("sell", depth)
+        if asks:
+            logger.info("Ask Orders:")
+            for order in reversed(asks):
+                logger.info(
+                    f"Order ID:{order.order_id}, Price: {order.price}, Qty: {order.quantity}"
+                )
+                print_line()
+        else:
+            logger.info("No Ask Orders Available.")
+            print_line()
+
+    def listBid(self, depth: int):
+        "List first (depth) orders in the Bid order book."
+        bids = self._firstOrders("buy", depth)
+        if bids:
+            logger.info("Bid Orders:")
+            for order in reversed(bids):
+                logger.info(
+                    f"Order ID: {order.order_id}, Price: {order.price}, Qty: {order.quantity}"
+                )
+                print_line()
+        else:
+            logger.info("No Bid orders Available.")
+            print_line()
+
+    def _firstOrders(self, order_side, depth):
+        """First (depth) live orders in price-time priority, walking levels from the top"""
+        orders = []
+        levels = self.levels[order_side]
+        for key in reversed(self.level_keys[order_side]):
+            if len(orders) >= depth:
+                break
+            for order in levels[self._levelTicks(order_side, key)].orders:
+                if order.quantity > 0:
+                    orders.append(order)
+                    if len(orders) >= depth:
+                        break
+        return orders
+
+    def _replenish(self, level, order):
+        """Show an iceberg's next slice at the back of its level, as a new arrival"""
+        order.quantity = min(order.display_quantity, order.hidden_quantity)
+        order.hidden_quantity -= order.quantity
+        level.hidden -= order.quantity
+        level.quantity += order.quantity
+        # Only the front order of a level trades, so that is where the spent slice sits
+        orders = level.orders
+        orders.popleft()
+        orders.append(order)
+        # Cancels queued behind the spent slice can now be at the front, the front must stay live
+        while orders[0].quantity == 0:
+            orders.popleft()
+
+    def _purgeLevel(self, order_side, level):
+        """Drop an emptied level, or dead orders sitting at the front of a live one"""
+        if level.count == 0:
+            del self.levels[order_side][level.ticks]
+            keys = self.level_keys[order_side]
+            key = self._levelKey(order_side, level.ticks)
+            if keys[-1] == key:
+                keys.pop()
+            else:
+                del keys[bisect.bisect_left(keys, key)]
+            return
+
+        orders = level.orders
+        while orders[0].quantity == 0:
+            orders.popleft()
+        # Cancelled orders behind the front are only skipped; compact once they dominate
+        if len(orders) > 2 * level.count:
+            level.orders = deque(order for order in orders if order.quantity > 0)
+
+    @staticmethod
+    def _oppositeSide(order_side):
+        if order_side not in ("buy", "sell"):
+            raise ValueError(f"Order side: '{order_side}' must be 'buy' or 'sell'")
+        return "sell" if order_side == "buy" else "buy"
+
+    @staticmethod
+    def _levelKey(order_side, ticks):
+        return ticks if order_side == "buy" else -ticks
+
+    @staticmethod
+    def _levelTicks(order_side, key):
+        return key if order_side == "buy" else -key
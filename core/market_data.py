@@ -0,0 +1,115 @@
+from collections import namedtuple
+from core.orders import LimitOrder
+from core.trades import Trade
+
+ADD = "add"
+REDUCE = "reduce"
+CANCEL = "cancel"
+MODIFY = "modify"
+TRADE = "trade"
+LEVEL = "level"
+
+# One incremental change of the book:
+#   add     order_id rests at price with quantity
+#   reduce  order_id was filled down to quantity (0 when it left the book)
+#   cancel  order_id was cancelled with quantity still open
+#   modify  order_id was amended down to quantity in place, keeping its priority
+#   trade   order_id (buy) traded quantity at price with contra_order_id (sell)
+#   level   total quantity resting at price on side is now quantity
+MarketDataEvent = namedtuple(
+    "MarketDataEvent",
+    ["seq", "event", "side", "order_id", "price", "quantity", "contra_order_id"],
+)
+
+
+class MarketDataFeed:
+    """Publishes the changes of a book as sequenced L3 (order) and L2 (level) events.
+
+    The book calls add/reduce/cancel/trade as it changes; every event gets the
+    next sequence number and is passed to each subscriber, a callable taking
+    one MarketDataEvent. Level totals are tracked here by price ticks.
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self.subscribers = []
+        self.level_quantity = {"buy": {}, "sell": {}}
+
+    def subscribe(self, subscriber):
+        self.subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.remove(subscriber)
+
+    def _publish(self, event, side, order_id, price, quantity, contra_order_id=None):
+        self.seq += 1
+        message = MarketDataEvent(self.seq, event, side, order_id, price, quantity, contra_order_id)
+        for subscriber in self.subscribers:
+            subscriber(message)
+
+    def _level(self, order, change):
+        levels = self.level_quantity[order.order_side]
+        quantity = levels.get(order.price_ticks, 0) + change
+        if quantity:
+            levels[order.price_ticks] = quantity
+        else:
+            del levels[order.price_ticks]
+        self._publish(LEVEL, order.order_side, None, order.price, quantity)
+
+    def add(self, order):
+        self._publish(ADD, order.order_side, order.order_id, order.price, order.quantity)
+        self._level(order, order.quantity)
+
+    def reduce(self, order, quantity):
+        """order was just filled for quantity"""
+        self._publish(REDUCE, order.order_side, order.order_id, order.price, order.quantity)
+        self._level(order, -quantity)
+
+    def cancel(self, order, quantity):
+        """order was just cancelled with quantity open"""
+        self._publish(CANCEL, order.order_side, order.order_id, order.price, quantity)
+        self._level(order, -quantity)
+
+    def modify(self, order, quantity):
+        """order was just amended down by quantity, in place"""
+        self._publish(MODIFY, order.order_side, order.order_id, order.price, order.quantity)
+        self._level(order, -quantity)
+
+    def trade(self, trade):
+        self._publish(
+            TRADE, None, trade.buy_order_id, trade.execution_price, trade.filled_quantity, trade.sell_order_id
+        )
+
+
+class BookReplica:
+    """Reference consumer rebuilding a book from a MarketDataFeed.
+
+    Applies the L3 events to a book without strategies, so its resting orders
+    end up in the same price-time priority as the source book, and records
+    the trade events in its trade manager. Subscribe it to the feed.
+    """
+
+    def __init__(self, book):
+        self.book = book
+        self.last_seq = 0
+
+    def __call__(self, message):
+        if message.seq != self.last_seq + 1:
+            raise ValueError(f"Market data gap: expected seq {self.last_seq + 1}, got {message.seq}")
+        self.last_seq = message.seq
+
+        if message.event == ADD:
+            self.book.restOrder(
+                LimitOrder(message.order_id, message.price, message.quantity, message.side, self.book.asset)
+            )
+        elif message.event == REDUCE:
+            order = self.book.order_map[message.order_id]
+            self.book.fillOrder(order, order.quantity - message.quantity)
+        elif message.event == CANCEL:
+            self.book.removeOrder(message.order_id)
+        elif message.event == MODIFY:
+            self.book.modifyOrder(message.order_id, message.quantity)
+        elif message.event == TRADE:
+            self.book.trade_manager.record_trade(
+                Trade(message.order_id, message.contra_order_id, message.price, message.quantity, self.book.asset)
+            )
@@ -1,203 +1,207 @@
 from core.interfaces import MatchingStrategy, OrderBookInterface
 from core.trades import Trade
-import heapq
-from core.orders import ConvertibleMarketOrder
+from core.orders import ConvertibleMarketOrder, LimitOrder
 from utils.helpers import print_line
 from utils.logger import logger
 
 
+def trade_maker(trade_class, new_order):
+    """make_trade callback for sweepOrders, with new_order on its own side of every trade"""
+    order_id = new_order.order_id
+    if new_order.order_side == "buy":
+        def make_trade(best_order, quantity):
+            return trade_class(order_id, best_order.order_id, best_order.price, quantity, best_order.asset)
+    else:
+        def make_trade(best_order, quantity):
+            return trade_class(best_order.order_id, order_id, best_order.price, quantity, best_order.asset)
+    return make_trade
+
+
 class MarketOrderMatching(MatchingStrategy):
+    """Fills a market order against the best prices of the other side.
+
+    By default the whole fill is handed to the book's sweepOrders, which
+    walks the levels in one pass and records the trades as a batch; with
+    sweep=False it steps through bestOrder/fillOrder one resting order at a
+    time. Both give the same trades, book and market data.
+    """
+
+    def __init__(self, trade_class=Trade, sweep: bool = True):
+        self.trade_class = trade_class
+        self.sweep = sweep
+
     def match(self, orderbook: OrderBookInterface, new_order):
 
         price_quantity = 0
         original_quantity = new_order.quantity
         avg_price = 0
 
-        if new_order.order_side == "buy":
+        is_buy = new_order.order_side == "buy"
+        opposite_side = "sell" if is_buy else "buy"
 
-            while orderbook.sell_orders and new_order.quantity > 0:
+        if self.sweep:
+            make_trade = trade_maker(self.trade_class, new_order)
+            filled, price_quantity = orderbook.sweepOrders(opposite_side, new_order.quantity, make_trade)
+            new_order.quantity -= filled
+        else:
+            while new_order.quantity > 0:
+
+                best_order = orderbook.bestOrder(opposite_side)
+                if best_order is None:
+                    break
+
+                traded_price = best_order.price
+                traded_quantity = min(new_order.quantity, best_order.quantity)
+                price_quantity += traded_quantity * best_order.price_ticks
+
+                orderbook.recordTrade(
+                    self.trade_class(
+                        new_order.order_id if is_buy else best_order.order_id,
+                        best_order.order_id if is_buy else new_order.order_id,
+                        traded_price,
+                        traded_quantity,
+                        best_order.asset,
+                    )
+                )
+                new_order.quantity -= traded_quantity
+                orderbook.fillOrder(best_order, traded_quantity)
+
+        # Test if there is order quantity left to hang
+        if new_order.quantity > 0:
+            if new_order.partial_fill_behavior == "convert_to_limit":
+                best_price = orderbook.getBid() if is_buy else orderbook.getAsk()
+                if best_price:
+                    limit_order = ConvertibleMarketOrder(new_order).convert_to_limit(best_price)
+                    orderbook.restOrder(limit_order)
+                    logger.info("Converted Market Order %s to Limit Order with price %s and quantity %s", new_order.order_id, limit_order.price, limit_order.quantity)
+                elif new_order.fallback_price:
+                    limit_order = ConvertibleMarketOrder(new_order).convert_to_limit(new_order.fallback_price)
+                    orderbook.restOrder(limit_order)
+                    logger.info("Converted Market Order %s to Limit Order with price %s and quantity %s", new_order.order_id, limit_order.price, limit_order.quantity)
+                else:
+                    raise ValueError(
+                        "There is no Bid to convert Market Order to Limit Order"
+                    )
+            elif new_order.partial_fill_behavior == "cancel":
+                logger.warning(
+                    "Cancelling market order %s, no liquidity in order book.", new_order.order_id
+                )
 
-                best_sell_order = orderbook.sell_orders[0]
-                traded_price = best_sell_order.price
+        avg_price = orderbook.price_grid.average_price(price_quantity, original_quantity)
+        logger.info("Average price for Market Order is: %s", avg_price)
+        print_line()
+        logger.info("Matching Market Order: %s", new_order)
+        print_line()
+        return avg_price
 
-                if new_order.quantity >= best_sell_order.quantity:
 
-                    traded_quantity = best_sell_order.quantity
-                    price_quantity += traded_quantity * traded_price
+class LimitOrderMatching(MatchingStrategy):
+    def __init__(self, trade_class=Trade):
+        self.trade_class = trade_class
 
-                    orderbook.trade_manager.record_trade(
-                        Trade(
-                            new_order.order_id,
-                            best_sell_order.order_id,
-                            traded_price,
-                            traded_quantity,
-                            best_sell_order.asset,
-                        )
-                    )
-                    new_order.quantity -= traded_quantity
-                    heapq.heappop(orderbook.sell_orders)
+    def match(self, orderbook: OrderBookInterface, new_order):
 
-                    if orderbook.sell_orders and orderbook.sell_orders[0].quantity == 0:
-                        orderbook.cleanHeap()
+        while True:
+            best_buy_order = orderbook.bestOrder("buy")
+            best_sell_order = orderbook.bestOrder("sell")
+
+            if (
+                best_buy_order is None
+                or best_sell_order is None
+                or best_buy_order.price_ticks < best_sell_order.price_ticks
+            ):
+                break
+
+            traded_quantity = min(best_buy_order.quantity, best_sell_order.quantity)
+            orderbook.recordTrade(
+                self.trade_class(
+                    best_buy_order.order_id,
+                    best_sell_order.order_id,
+                    best_sell_order.price,
+                    traded_quantity,
+                    best_sell_order.asset,
+                )
+            )
+            orderbook.fillOrder(best_sell_order, traded_quantity)
+            orderbook.fillOrder(best_buy_order, traded_quantity)
 
-                else:
+        #logger.info(f"Matching limit order {new_order}")
+        #print_line()
 
-                    traded_quantity = new_order.quantity
 
-                    price_quantity += traded_quantity * traded_price
+class IOCOrderMatching(MatchingStrategy):
+    """Trades an IOCOrder against the other side up to its price, dropping what is left"""
 
-                    orderbook.trade_manager.record_trade(
-                        Trade(
-                            new_order.order_id,
-                            best_sell_order.order_id,
-                            traded_price,
-                            traded_quantity,
-                            new_order.asset,
-                        )
-                    )
-                    orderbook.sell_orders[0].quantity -= new_order.quantity
-                    new_order.quantity = 0
-
-            # Test if there is order quantity left to hang
-            if new_order.quantity > 0 and not orderbook.sell_orders:
-                if new_order.partial_fill_behavior == "convert_to_limit":
-                    best_bid = orderbook.getBid()
-                    if best_bid:
-                        limit_order = ConvertibleMarketOrder(new_order).convert_to_limit(best_bid)
-                        heapq.heappush(orderbook.buy_orders, limit_order)
-                        logger.info(f"Converted Market Order {new_order.order_id} to Limit Order with price {limit_order.price} and quantity {limit_order.quantity}")
-                    elif new_order.fallback_price:
-                        limit_order = ConvertibleMarketOrder(new_order).convert_to_limit(new_order.fallback_price)
-                        heapq.heappush(orderbook.buy_orders, limit_order)
-                        logger.info(f"Converted Market Order {new_order.order_id} to Limit Order with price {limit_order.price} and quantity {limit_order.quantity}")
-                    else:
-                        raise ValueError(
-                            "There is no Bid to convert Market Order to Limit Order"
-                        )
-                elif new_order.partial_fill_behavior == "cancel":
-                    logger.warning(
-                        f"Cancelling market order {new_order.order_id} no liquidity in order book."
-                    )
+    def __init__(self, trade_class=Trade):
+        self.trade_class = trade_class
 
-        else:
+    def match(self, orderbook: OrderBookInterface, new_order):
+        opposite_side = "sell" if new_order.order_side == "buy" else "buy"
+        new_order.price_ticks = orderbook.price_grid.to_ticks(new_order.price)
+        quantity = orderbook.fillableQuantity(opposite_side, new_order.price_ticks, new_order.quantity)
+        if quantity:
+            self.fill(orderbook, new_order, opposite_side, quantity)
+        if new_order.quantity:
+            logger.info("Cancelling %s left on IOC order %s", new_order.quantity, new_order.order_id)
 
-            while orderbook.buy_orders and new_order.quantity > 0:
+    def fill(self, orderbook, new_order, opposite_side, quantity):
+        """Sweep a quantity known to rest within the order's price"""
+        filled, _ = orderbook.sweepOrders(opposite_side, quantity, trade_maker(self.trade_class, new_order))
+        new_order.quantity -= filled
 
-                best_buy_order = orderbook.buy_orders[0]
-                traded_price = best_buy_order.price
 
-                if new_order.quantity >= orderbook.buy_orders[0].quantity:
+class FOKOrderMatching(IOCOrderMatching):
+    """Trades a FOKOrder in full up to its price, or not at all.
 
-                    traded_quantity = best_buy_order.quantity
+    The quantity resting within its price is summed first, only over the
+    levels it needs, so a killed order never touches the book.
+    """
 
-                    price_quantity += traded_quantity * traded_price
-                    orderbook.trade_manager.record_trade(
-                        Trade(
-                            best_buy_order.order_id,
-                            new_order.order_id,
-                            traded_price,
-                            traded_quantity,
-                            best_buy_order.asset,
-                        )
-                    )
+    def match(self, orderbook: OrderBookInterface, new_order):
+        opposite_side = "sell" if new_order.order_side == "buy" else "buy"
+        new_order.price_ticks = orderbook.price_grid.to_ticks(new_order.price)
+        quantity = orderbook.fillableQuantity(opposite_side, new_order.price_ticks, new_order.quantity)
+        if quantity < new_order.quantity:
+            logger.info(
+                "Killing FOK order %s, only %s of %s available", new_order.order_id, quantity, new_order.quantity
+            )
+            return
+        self.fill(orderbook, new_order, opposite_side, quantity)
 
-                    new_order.quantity -= traded_quantity
-                    heapq.heappop(orderbook.buy_orders)
-                    if orderbook.buy_orders and orderbook.buy_orders[0].quantity == 0:
-                        orderbook.cleanHeap()
-                else:
-                    traded_quantity = new_order.quantity
-                    price_quantity += traded_quantity * traded_price
-                    orderbook.trade_manager.record_trade(
-                        Trade(
-                            best_buy_order.order_id,
-                            new_order.order_id,
-                            traded_price,
-                            traded_quantity,
-                            new_order.asset,
-                        )
-                    )
-                    orderbook.buy_orders[0].quantity -= new_order.quantity
-
-            # Test if there is order quantity left to hang
-            if new_order.quantity > 0 and not orderbook.buy_orders:
-                if new_order.partial_fill_behavior == "convert_to_limit":
-                    best_ask = orderbook.getAsk()
-                    if best_ask:
-                        limit_order = ConvertibleMarketOrder(new_order).convert_to_limit(best_ask)
-                        heapq.heappush(orderbook.sell_orders, limit_order)
-                        logger.info(f"Converted Market Order {new_order.order_id} to Limit Order with price {limit_order.price} and quantity {limit_order.quantity}")
-                    elif new_order.fallback_price:
-                        limit_order = ConvertibleMarketOrder(new_order).convert_to_limit(new_order.fallback_price)
-                        heapq.heappush(orderbook.sell_orders, limit_order)
-                        logger.info(f"Converted Market Order {new_order.order_id} to Limit Order with price {limit_order.price} and quantity {limit_order.quantity}")
-                    else:
-                        raise ValueError(
-                            "There is no Bid to convert Market Order to Limit Order"
-                        )
-                elif new_order.partial_fill_behavior == "cancel":
-                    logger.warning(
-                        f"Cancelling market order {new_order.order_id}, no liquidity in book order."
-                    )
 
-        avg_price = price_quantity / original_quantity if original_quantity else 0
-        logger.info(f"Average price for Market Order is: {avg_price}")
-        print_line()
-        logger.info(f"Matching Market Order: {new_order}")
-        print_line()
-        return avg_price
+class PostOnlyOrderMatching(MatchingStrategy):
+    """Rests a PostOnlyOrder as a limit order, or rejects it if it would trade"""
 
+    def match(self, orderbook: OrderBookInterface, new_order):
+        is_buy = new_order.order_side == "buy"
+        ticks = orderbook.price_grid.to_ticks(new_order.price)
+        best_order = orderbook.bestOrder("sell" if is_buy else "buy")
+        if best_order is not None and (
+            best_order.price_ticks <= ticks if is_buy else best_order.price_ticks >= ticks
+        ):
+            logger.warning(
+                "Rejecting post only order %s, it would trade against %s", new_order.order_id, best_order.price
+            )
+            return
+        orderbook.restOrder(
+            LimitOrder(new_order.order_id, new_order.price, new_order.quantity, new_order.order_side, new_order.asset)
+        )
+
+
+class StopOrderMatching(MatchingStrategy):
+    """Parks a StopOrder or StopLimitOrder in the book's stop index until its price trades"""
 
-class LimitOrderMatching(MatchingStrategy):
     def match(self, orderbook: OrderBookInterface, new_order):
+        orderbook.addStop(new_order)
 
-        if (
-            orderbook.buy_orders
-            and orderbook.sell_orders
-            and (
-                orderbook.buy_orders[0].quantity == 0
-                or orderbook.sell_orders[0].quantity == 0
-            )
-        ):
-            orderbook.cleanHeap()
 
-        while (
-            orderbook.buy_orders
-            and orderbook.sell_orders
-            and orderbook.buy_orders[0].price >= orderbook.sell_orders[0].price
-        ):
-            best_buy_order = orderbook.buy_orders[0]
-            best_sell_order = orderbook.sell_orders[0]
-
-            if best_buy_order.quantity >= best_sell_order.quantity:
-                orderbook.trade_manager.record_trade(
-                    Trade(
-                        best_buy_order.order_id,
-                        best_sell_order.order_id,
-                        best_sell_order.price,
-                        best_sell_order.quantity,
-                        best_sell_order.asset,
-                    )
-                )
-                best_buy_order.quantity -= best_sell_order.quantity
-                heapq.heappop(orderbook.sell_orders)
-                if orderbook.buy_orders and best_buy_order.quantity == 0:
-                    heapq.heappop(orderbook.buy_orders)
-
-            else:
-                orderbook.trade_manager.record_trade(
-                    Trade(
-                        best_buy_order.order_id,
-                        best_sell_order.order_id,
-                        best_sell_order.price,
-                        best_buy_order.quantity,
-                        best_sell_order.asset,
-                    )
-                )
-                best_sell_order.quantity -= best_buy_order.quantity
-                heapq.heappop(orderbook.buy_orders)
-                if orderbook.sell_orders and best_sell_order.quantity == 0:
-                    heapq.heappop(orderbook.sell_orders)
+class IcebergOrderMatching(LimitOrderMatching):
+    """Rests an IcebergOrder's visible slice and matches it like a limit order.
 
-        #logger.info(f"Matching limit order {new_order}")
-        #print_line()
\ No newline at end of file
+    The book shows the next slice whenever one fills, so a crossing iceberg
+    keeps trading with its hidden quantity too.
+    """
+
+    def match(self, orderbook: OrderBookInterface, new_order):
+        orderbook.restOrder(new_order)
+        super().match(orderbook, new_order)
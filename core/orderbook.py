@@ -1,93 +1,511 @@
-from utils.logger import logger
+from utils.logger import logger, request_log_mode
 from core.interfaces import OrderBookInterface, TradeManagerInterface, MatchingStrategy
-from core.orders import LimitOrder
+from core.orders import LimitOrder, IcebergOrder
+from core.ticks import PriceGrid
+from core.depth import DepthCache
+from core.triggers import StopIndex
+from utils.metrics import BookMetrics, clock
+import copy
 import heapq
+import itertools
 from utils.helpers import print_line
 
 
 class HeapOrderBook(OrderBookInterface):
+    """Order book keeping one binary heap per side.
+
+    Heap entries are (price key, arrival sequence, order) tuples, the price key
+    being -ticks for bids and ticks for asks, so every heap comparison is a
+    native tuple compare and equal prices fall back to arrival order.
+    """
+
     def __init__(
         self,
         asset,
         trade_manager: TradeManagerInterface,
         strategies: dict[str, MatchingStrategy],
+        compaction_ratio: float | None = 0.5,
+        log_mode: str | None = None,
+        tick_size: float | None = None,
+        lot_size: int | None = None,
+        depth_levels: int | None = None,
+        market_data=None,
+        metrics: BookMetrics | None = None,
     ):
+        if log_mode is not None:
+            # Process wide: "queue" turns queue logging on for every book, "sync" leaves it as it is
+            request_log_mode(log_mode)
         self.asset = asset
-        self.buy_orders = []
-        self.sell_orders = []
+        self.price_grid = PriceGrid(tick_size, lot_size)
+        self.heaps = {"buy": [], "sell": []}
+        self.sequence = itertools.count()  # Arrival order, the time priority of the book
         self.trade_manager = trade_manager
         self.strategies = strategies
         self.order_map = {}  # Dicionário para armazenar ordens pelo ID
+        # Share of dead (zero quantity) entries in a heap that triggers a rebuild, None to never compact
+        self.compaction_ratio = compaction_ratio
+        self.dead_orders = {"buy": 0, "sell": 0}
+        self.compactions = 0
+        self._batch_trades = None  # Set while addOrders runs, collects the trades it produces
+        # Aggregated top (depth_levels) levels kept up to date on every change, None to skip it
+        self.depth_cache = DepthCache(depth_levels) if depth_levels is not None else None
+        self.market_data = market_data  # MarketDataFeed publishing every change, or None
+        self.metrics = metrics  # BookMetrics timing the hot path, or None
+        self.stops = StopIndex()  # Stop orders waiting for their trigger price
+        self.last_trade_price = None
 
     def addOrder(self, order_type, order):
+        metrics = self.metrics
+        if metrics is not None:
+            start = clock()
 
-        self.order_map[order.order_id] = order
-
+        if order.asset != self.asset:
+            raise ValueError(f"Order asset: '{order.asset}' does not match book asset '{self.asset}'")
+        self.price_grid.check_quantity(order.quantity)
         if isinstance(order, LimitOrder):
-
-            if order.order_side == "buy":
-                heapq.heappush(self.buy_orders, order)
-
-            elif order.order_side == "sell":
-                heapq.heappush(self.sell_orders, order)
+            self.restOrder(order)
 
         if order_type in self.strategies:
-            logger.info(f"Placing order {order_type}: {order}")
+            logger.info("Placing order %s: %s", order_type, order)
             print_line()
-            self.strategies[order_type].match(self, order)
+            if metrics is None:
+                self.strategies[order_type].match(self, order)
+            else:
+                self._timedMatch(self.strategies[order_type], order)
+            if self.stops.orders and self.last_trade_price != self.stops.last_price:
+                self.stops.release(self)
+
+        if metrics is not None:
+            metrics.record("order", clock() - start)
+
+    def addOrders(self, orders, trades=None):
+        """Add a stream of (order_type, order) pairs and return the trades they produced.
+
+        Matches exactly like calling addOrder in a loop, but looks up the
+        strategies once and skips the per order logging, so it can be fed a
+        generator replaying millions of orders. Pass a trades list to collect
+        into it, to keep the trades made before an order raises.
+        """
+        trades = self._batch_trades = [] if trades is None else trades
+        strategies = self.strategies
+        rest_order = self.restOrder
+        check_quantity = self.price_grid.check_quantity
+        asset = self.asset
+        metrics = self.metrics
+        stops = self.stops
+        try:
+            for order_type, order in orders:
+                if metrics is not None:
+                    start = clock()
+                if order.asset != asset:
+                    raise ValueError(f"Order asset: '{order.asset}' does not match book asset '{asset}'")
+                check_quantity(order.quantity)
+                if isinstance(order, LimitOrder):
+                    rest_order(order)
+                strategy = strategies.get(order_type)
+                if strategy is not None:
+                    if metrics is None:
+                        strategy.match(self, order)
+                    else:
+                        self._timedMatch(strategy, order)
+                    if stops.orders and self.last_trade_price != stops.last_price:
+                        stops.release(self)
+                if metrics is not None:
+                    metrics.record("order", clock() - start)
+        finally:
+            self._batch_trades = None
+        return trades
 
     def removeOrder(self, order_id: int):
-        if order_id in self.order_map:
-            self.order_map[order_id].quantity = 0
-            del self.order_map[order_id]
+        metrics = self.metrics
+        if metrics is not None:
+            start = clock()
+        order = self.order_map.pop(order_id, None)
+        if order is None:
+            if not self.stops.remove(order_id) and metrics is not None:
+                metrics.cancel_misses += 1
+            return
+        if self.depth_cache is not None:
+            self.depth_cache.reduce(order.order_side, order.price_ticks, order.quantity, True, order.hidden_quantity)
+        if self.market_data is not None:
+            self.market_data.cancel(order, order.quantity)
+        order.quantity = 0
+        if order.hidden_quantity:
+            order.hidden_quantity = 0
+        self.dead_orders[order.order_side] += 1
+        self.cleanHeap()
+        self._compactIfNeeded(order.order_side)
+        if metrics is not None:
+            metrics.record("cancel", clock() - start)
+
+    def modifyOrder(self, order_id: int, new_quantity: int, new_price=None):
+        """Amend a resting order, returning it as it now rests (None once gone).
+
+        Lowering the quantity at the same price is done in place and keeps
+        time priority. A new price or a larger quantity cancels the order and
+        requeues an amended copy at the back of its level, matching it if it
+        now crosses. A quantity of 0 cancels it. For an IcebergOrder
+        new_quantity is its total, visible plus hidden, and a cut comes off
+        the hidden quantity first.
+        """
+        if new_quantity < 0:
+            raise ValueError("Quantity must not be negative!")
+        order = self.order_map.get(order_id)
+        if order is None:
+            return None
+        if new_quantity == 0:
+            self.removeOrder(order_id)
+            return None
+        self.price_grid.check_quantity(new_quantity)
+
+        same_price = new_price is None or self.price_grid.to_ticks(new_price) == order.price_ticks
+        if same_price and new_quantity <= order.quantity + order.hidden_quantity:
+            reduced = order.quantity + order.hidden_quantity - new_quantity
+            if order.hidden_quantity and reduced:
+                hidden_cut = min(reduced, order.hidden_quantity)
+                order.hidden_quantity -= hidden_cut
+                reduced -= hidden_cut
+                if self.depth_cache is not None:
+                    self.depth_cache.reduce(order.order_side, order.price_ticks, 0, False, hidden_cut)
+            if reduced:
+                order.quantity -= reduced
+                if self.depth_cache is not None:
+                    self.depth_cache.reduce(order.order_side, order.price_ticks, reduced, False)
+                if self.market_data is not None:
+                    self.market_data.modify(order, reduced)
+            return order
+
+        # The requeued order may cross, without a strategy to match it the book would stay crossed
+        strategy = self.strategies.get("limit")
+        if strategy is None:
+            raise ValueError("Book has no 'limit' strategy to match an amended order")
+        # The old heap entry keeps pointing at the original, which becomes its tombstone
+        amended = copy.copy(order)
+        if isinstance(amended, IcebergOrder):
+            amended.quantity = min(amended.display_quantity, new_quantity)
+            amended.hidden_quantity = new_quantity - amended.quantity
+        else:
+            amended.quantity = new_quantity
+        if not same_price:
+            amended.price = new_price
+        self.removeOrder(order_id)
+        self.restOrder(amended)
+        strategy.match(self, amended)
+        if self.stops.orders and self.last_trade_price != self.stops.last_price:
+            self.stops.release(self)
+        return amended if amended.quantity > 0 else None
+
+    def restOrder(self, order):
+        """Push a limit order into its side of the book, without matching it"""
+        order.price_ticks = self.price_grid.to_ticks(order.price)
+        self.order_map[order.order_id] = order
+        if self.depth_cache is not None:
+            self.depth_cache.add(
+                order.order_side, order.price_ticks, order.price, order.quantity, order.hidden_quantity
+            )
+        if self.market_data is not None:
+            self.market_data.add(order)
+
+        if order.order_side == "buy":
+            heapq.heappush(self.heaps["buy"], (-order.price_ticks, next(self.sequence), order))
+
+        elif order.order_side == "sell":
+            heapq.heappush(self.heaps["sell"], (order.price_ticks, next(self.sequence), order))
+
+    def addStop(self, order):
+        """Hold a stop order off the book until a trade reaches its stop price"""
+        order.stop_ticks = self.price_grid.to_ticks(order.stop_price)
+        self.stops.add(order)
+
+    def fillableQuantity(self, order_side: str, limit_ticks, quantity: int):
+        """Quantity, up to quantity, resting on order_side at limit_ticks or better.
+
+        Children in a heap never sort before their parent, so a depth first
+        walk from the root can drop every subtree past the limit; it only
+        visits the entries it sums and stops once quantity is reached.
+        """
+        heap = self.heaps[order_side]
+        limit_key = -limit_ticks if order_side == "buy" else limit_ticks
+        size = len(heap)
+        total = 0
+        pending = [0] if heap else []
+        while pending and total < quantity:
+            index = pending.pop()
+            key, _, order = heap[index]
+            if key > limit_key:
+                continue
+            total += order.quantity + order.hidden_quantity  # 0 for dead entries
+            child = 2 * index + 1
+            if child < size:
+                pending.append(child)
+                if child + 1 < size:
+                    pending.append(child + 1)
+        return min(total, quantity)
+
+    def bestOrder(self, order_side: str):
+        """Best live order on the given side, or None if that side is empty.
+
+        Every removal runs cleanHeap, so the top of each heap is always live.
+        """
+        heap = self.heaps[order_side]
+        return heap[0][2] if heap else None
+
+    @property
+    def buy_orders(self):
+        """Resting bids in heap layout (index 0 is the best), for inspection"""
+        return [entry[2] for entry in self.heaps["buy"]]
+
+    @property
+    def sell_orders(self):
+        """Resting asks in heap layout (index 0 is the best), for inspection"""
+        return [entry[2] for entry in self.heaps["sell"]]
+
+    def fillOrder(self, order, quantity: int):
+        """Reduce a resting order by a traded quantity, dropping it once fully filled"""
+        order.quantity -= quantity
+        if self.depth_cache is not None:
+            # An iceberg with hidden quantity left stays on the level, refilled below
+            removed = order.quantity == 0 and not order.hidden_quantity
+            self.depth_cache.reduce(order.order_side, order.price_ticks, quantity, removed)
+        if self.market_data is not None:
+            self.market_data.reduce(order, quantity)
+        if order.quantity == 0:
+            if order.hidden_quantity:
+                self._replenish(order)
+                return
+            self.order_map.pop(order.order_id, None)
+            self.dead_orders[order.order_side] += 1
             self.cleanHeap()
 
+    def recordTrade(self, trade):
+        self.last_trade_price = trade.execution_price
+        if self.metrics is None:
+            self.trade_manager.record_trade(trade)
+        else:
+            start = clock()
+            self.trade_manager.record_trade(trade)
+            self.metrics.record("trade", clock() - start)
+        if self.market_data is not None:
+            self.market_data.trade(trade)
+        if self._batch_trades is not None:
+            self._batch_trades.append(trade)
+
+    def sweepOrders(self, order_side: str, quantity: int, make_trade):
+        """Take up to quantity from the best orders of one side in a single pass.
+
+        Fills exactly like repeated bestOrder/fillOrder calls, calling
+        make_trade(resting_order, traded_quantity) for each fill, but pops
+        filled orders straight off the heap and hands all the trades to the
+        trade manager as one batch. Returns (filled quantity, sum of
+        price ticks * quantity) so the caller can work out the average price.
+        """
+        heap = self.heaps[order_side]
+        order_map = self.order_map
+        depth_cache = self.depth_cache
+        market_data = self.market_data
+        trades = []
+        remaining = quantity
+        tick_volume = 0
+        dead = 0
+        while remaining > 0 and heap:
+            order = heap[0][2]  # The top is always live
+            traded = remaining if remaining < order.quantity else order.quantity
+            trade = make_trade(order, traded)
+            trades.append(trade)
+            if market_data is not None:
+                market_data.trade(trade)
+            remaining -= traded
+            tick_volume += traded * order.price_ticks
+            order.quantity -= traded
+            if depth_cache is not None:
+                removed = order.quantity == 0 and not order.hidden_quantity
+                depth_cache.reduce(order_side, order.price_ticks, traded, removed)
+            if market_data is not None:
+                market_data.reduce(order, traded)
+            if order.quantity == 0:
+                if order.hidden_quantity:
+                    self._replenish(order)
+                    continue
+                order_map.pop(order.order_id, None)
+                heapq.heappop(heap)
+                while heap and heap[0][2].quantity == 0:
+                    heapq.heappop(heap)
+                    dead += 1
+        self.dead_orders[order_side] -= dead
+        if trades:
+            self._recordTrades(trades)
+        return quantity - remaining, tick_volume
+
     def cleanHeap(self):
         """Remove ordens inválidas do topo da heap"""
-        while self.buy_orders and self.buy_orders[0].quantity == 0:
-            heapq.heappop(self.buy_orders)
-        while self.sell_orders and self.sell_orders[0].quantity == 0:
-            heapq.heappop(self.sell_orders)
+        for order_side, heap in self.heaps.items():
+            while heap and heap[0][2].quantity == 0:
+                heapq.heappop(heap)
+                self.dead_orders[order_side] -= 1
+
+    def getSnapshot(self):
+        """Versioned top of book and depth, without touching the heaps or logging"""
+        if self.depth_cache is None:
+            raise ValueError("Depth cache is off, create the book with depth_levels")
+        return self.depth_cache.snapshot()
+
+    def estimateFill(self, order_side: str, quantity: int):
+        """FillEstimate of a market order of this side and quantity, without touching the book.
+
+        Reads the depth cache's running totals. After the other side changed
+        they are summed again, only over the levels the quantity reaches, so
+        a check costs O(levels reached) after a change and O(log levels)
+        between changes.
+        """
+        if self.depth_cache is None:
+            raise ValueError("Depth cache is off, create the book with depth_levels")
+        return self.depth_cache.cumulative(self._oppositeSide(order_side)).estimate(quantity, self.price_grid)
+
+    def estimateFills(self, order_side: str, quantities):
+        """estimateFill for many quantities against the same book"""
+        if self.depth_cache is None:
+            raise ValueError("Depth cache is off, create the book with depth_levels")
+        cumulative = self.depth_cache.cumulative(self._oppositeSide(order_side))
+        return [cumulative.estimate(quantity, self.price_grid) for quantity in quantities]
+
+    def getHeapStats(self):
+        """Live vs dead heap entries, to watch tombstone build up under cancel heavy flow"""
+        return {
+            "live_orders": len(self.order_map),
+            "dead_orders": self.dead_orders["buy"] + self.dead_orders["sell"],
+            "buy_entries": len(self.heaps["buy"]),
+            "sell_entries": len(self.heaps["sell"]),
+            "buy_dead": self.dead_orders["buy"],
+            "sell_dead": self.dead_orders["sell"],
+            "compactions": self.compactions,
+        }
+
+    def getMetrics(self):
+        """Hot path timers and counters, with the current depth and tombstone count"""
+        if self.metrics is None:
+            raise ValueError("Metrics are off, create the book with metrics=BookMetrics()")
+        return self.metrics.stats(**self._metricGauges())
+
+    def dumpMetrics(self):
+        """getMetrics as a text table"""
+        if self.metrics is None:
+            raise ValueError("Metrics are off, create the book with metrics=BookMetrics()")
+        return self.metrics.dump(**self._metricGauges())
+
+    def _metricGauges(self):
+        return {
+            "buy_depth": len(self.heaps["buy"]) - self.dead_orders["buy"],
+            "sell_depth": len(self.heaps["sell"]) - self.dead_orders["sell"],
+            "tombstones": self.dead_orders["buy"] + self.dead_orders["sell"],
+            "compactions": self.compactions,
+        }
+
+    def _replenish(self, order):
+        """Show an iceberg's next slice at the back of its price, as a new arrival, in O(log n)"""
+        order.quantity = min(order.display_quantity, order.hidden_quantity)
+        order.hidden_quantity -= order.quantity
+        key = -order.price_ticks if order.order_side == "buy" else order.price_ticks
+        # Only the best order trades, so the spent slice is the top of its heap
+        heap = self.heaps[order.order_side]
+        heapq.heapreplace(heap, (key, next(self.sequence), order))
+        # Cancels behind the iceberg at its price can surface now, the top must stay live
+        while heap[0][2].quantity == 0:
+            heapq.heappop(heap)
+            self.dead_orders[order.order_side] -= 1
+        if self.depth_cache is not None:
+            self.depth_cache.refill(order.order_side, order.price_ticks, order.quantity)
+        if self.market_data is not None:
+            self.market_data.add(order)
+
+    def _recordTrades(self, trades):
+        """recordTrade for a batch whose market data was already published"""
+        self.last_trade_price = trades[-1].execution_price
+        if self.metrics is None:
+            self.trade_manager.record_trades(trades)
+        else:
+            start = clock()
+            self.trade_manager.record_trades(trades)
+            # Spread the batch over its trades so the trade count stays right
+            elapsed = (clock() - start) // len(trades)
+            for _ in trades:
+                self.metrics.record("trade", elapsed)
+        if self._batch_trades is not None:
+            self._batch_trades.extend(trades)
+
+    def _timedMatch(self, strategy, order):
+        metrics = self.metrics
+        trades = metrics.timers["trade"].count
+        start = clock()
+        strategy.match(self, order)
+        metrics.record("match", clock() - start)
+        metrics.trades_per_order.record(metrics.timers["trade"].count - trades)
+
+    @staticmethod
+    def _oppositeSide(order_side):
+        if order_side not in ("buy", "sell"):
+            raise ValueError(f"Order side: '{order_side}' must be 'buy' or 'sell'")
+        return "sell" if order_side == "buy" else "buy"
+
+    def _compactIfNeeded(self, order_side):
+        """Rebuild one heap without its dead entries once they pass compaction_ratio.
+
+        Cancels deep in the book can't be popped, so they are left as zero
+        quantity tombstones; an O(n) heapify every time they make up a fixed
+        share of the heap keeps cancels O(log n) amortized and memory bounded.
+        """
+        if self.compaction_ratio is None:
+            return
+        heap = self.heaps[order_side]
+        if self.dead_orders[order_side] <= self.compaction_ratio * len(heap):
+            return
+        heap[:] = [entry for entry in heap if entry[2].quantity > 0]
+        heapq.heapify(heap)
+        self.dead_orders[order_side] = 0
+        self.compactions += 1
 
     def getAskOrder(self):
-        if self.sell_orders:
-            logger.info(f"Ask order: {self.sell_orders[0]}")
+        order = self.bestOrder("sell")
+        if order is not None:
+            logger.info(f"Ask order: {order}")
             print_line()
-            return self.sell_orders[0]
+            return order
         else:
             logger.info("Ask Book is empty.")
             print_line()
 
     def getBidOrder(self):
-        if self.buy_orders:
-            logger.info(f"Bid order: {self.buy_orders[0]}")
+        order = self.bestOrder("buy")
+        if order is not None:
+            logger.info(f"Bid order: {order}")
             print_line()
-            return self.buy_orders[0]
+            return order
         else:
             logger.info("Bid Book is empty.")
             print_line()
     
     def getAsk(self):
-        if self.sell_orders:
-            logger.info(f"Ask: {self.sell_orders[0].price}")
+        order = self.bestOrder("sell")
+        if order is not None:
+            logger.info(f"Ask: {order.price}")
             print_line()
-            return self.sell_orders[0].price
+            return order.price
         else:
             logger.info("Ask Book is empty.")
             print_line()
 
     def getBid(self):
-        if self.buy_orders:
-            logger.info(f"Bid: {self.buy_orders[0].price}")
+        order = self.bestOrder("buy")
+        if order is not None:
+            logger.info(f"Bid: {order.price}")
             print_line()
-            return self.buy_orders[0].price
+            return order.price
         else:
             logger.info("Bid Book is empty.")
             print_line()
 
     def listAsk(self, depth: int):
         """List first (depth) orders in the Ask order book"""
-        asks = heapq.nsmallest(depth, self.sell_orders)
+        asks = self._firstOrders("sell", depth)
         if asks:
             logger.info("Ask Orders:")
             for order in reversed(asks):
@@ -101,7 +519,7 @@ class HeapOrderBook(OrderBookInterface):
 
     def listBid(self, depth: int):
         "List first (depth) orders in the Bid order book."
-        bids = heapq.nlargest(depth, self.buy_orders)
+        bids = self._firstOrders("buy", depth)
         if bids:
             logger.info("Bid Orders:")
             for order in reversed(bids):
@@ -111,4 +529,9 @@ class HeapOrderBook(OrderBookInterface):
                 print_line()
         else:
             logger.info("No Bid orders Available.")
-            print_line()
\ No newline at end of file
+            print_line()
+
+    def _firstOrders(self, order_side, depth):
+        """First (depth) live orders in price-time priority, skipping dead heap entries"""
+        entries = heapq.nsmallest(depth + self.dead_orders[order_side], self.heaps[order_side])
+        return [entry[2] for entry in entries if entry[2].quantity > 0][:depth]
@@ -1,8 +1,16 @@
 from datetime import datetime
 from abc import ABC, abstractmethod
+import itertools
+import sys
+
+# Process wide arrival sequence used as the timestamp of the compact order variants
+_order_sequence = itertools.count(1)
 
 
 class AbstractOrder(ABC):
+
+    __slots__ = ("order_id", "quantity", "order_side", "asset", "timestamp")
+
     def __init__(self, order_id: int, quantity: int, order_side: str, asset: str):
         self.order_id = order_id
         self.quantity = quantity
@@ -13,6 +21,8 @@ class AbstractOrder(ABC):
     def validate(self):
         if self.quantity <= 0:
             raise ValueError("Quantity must be bigger than zero!")
+        if self.order_side not in ("buy", "sell"):
+            raise ValueError(f"Order side: '{self.order_side}' must be 'buy' or 'sell'")
     
     def __repr__(self):
         return f"<{self.__class__.__name__} id={self.order_id}, qty={self.quantity}, side={self.order_side}, asset={self.asset}>"
@@ -23,6 +33,9 @@ class AbstractOrder(ABC):
 
 
 class BaseOrder(AbstractOrder):
+
+    __slots__ = ("partial_fill_behavior", "fallback_price")
+
     def __init__(
         self,
         order_id: int,
@@ -43,9 +56,15 @@ class BaseOrder(AbstractOrder):
 
 
 class PricedOrder(AbstractOrder):
+
+    __slots__ = ("price", "price_ticks")
+
+    hidden_quantity = 0  # Quantity held back from the book, only IcebergOrder has any
+
     def __init__(self, order_id, price, quantity, order_side, asset):
         super().__init__(order_id, quantity, order_side, asset)
         self.price = price
+        self.price_ticks = price  # Set to integer ticks by books with a tick size
 
     def __repr__(self):
         return f"<{self.__class__.__name__} id={self.order_id}, price: {self.price}, qty={self.quantity}, side={self.order_side}, asset={self.asset}>"
@@ -64,6 +83,8 @@ class PricedOrder(AbstractOrder):
 
 class LimitOrder(PricedOrder):
 
+    __slots__ = ()
+
     def __init__(self, order_id, price, quantity, order_side, asset):
         super().__init__(order_id, price, quantity, order_side, asset)
 
@@ -81,6 +102,8 @@ class LimitOrder(PricedOrder):
 
 class MarketOrder(BaseOrder):
 
+    __slots__ = ()
+
     def __init__(
         self, order_id, quantity, order_side, asset, partial_fill_behavior="cancel", fallback_price = None,
     ):
@@ -94,6 +117,8 @@ class MarketOrder(BaseOrder):
 
 class ConvertibleMarketOrder(MarketOrder):
 
+    __slots__ = ()
+
     def __init__(self, order: MarketOrder):
         super().__init__(order.order_id, order.quantity, order.order_side, order.asset,order.partial_fill_behavior, order.fallback_price)
 
@@ -105,4 +130,118 @@ class ConvertibleMarketOrder(MarketOrder):
 
         return LimitOrder(
             self.order_id, price, self.quantity, self.order_side, self.asset
-        )
\ No newline at end of file
+        )
+
+
+class IOCOrder(PricedOrder):
+    """Immediate or cancel: trades what it can up to its price, the rest is dropped"""
+
+    __slots__ = ()
+
+
+class FOKOrder(PricedOrder):
+    """Fill or kill: trades its whole quantity up to its price at once, or nothing"""
+
+    __slots__ = ()
+
+
+class PostOnlyOrder(PricedOrder):
+    """Rests as a limit order, rejected instead if it would trade on arrival"""
+
+    __slots__ = ()
+
+
+class IcebergOrder(PricedOrder):
+    """Limit order showing at most display_quantity at a time.
+
+    quantity is the visible slice and hidden_quantity the rest. Each time the
+    slice fills the book shows the next one at the back of the price level,
+    so every refill loses time priority like a new order would.
+    """
+
+    __slots__ = ("display_quantity", "hidden_quantity")
+
+    def __init__(self, order_id, price, quantity, order_side, asset, display_quantity):
+        if display_quantity <= 0:
+            raise ValueError("Display quantity must be bigger than zero!")
+        super().__init__(order_id, price, min(quantity, display_quantity), order_side, asset)
+        self.display_quantity = display_quantity
+        self.hidden_quantity = quantity - self.quantity
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} id={self.order_id}, price: {self.price}, qty={self.quantity}, hidden={self.hidden_quantity}, side={self.order_side}, asset={self.asset}>"
+
+
+class StopOrder(AbstractOrder):
+    """Waits off the book until a trade at or through stop_price, then becomes a market order"""
+
+    __slots__ = ("stop_price", "stop_ticks")
+
+    def __init__(self, order_id, stop_price, quantity, order_side, asset):
+        super().__init__(order_id, quantity, order_side, asset)
+        self.stop_price = stop_price
+        self.stop_ticks = stop_price  # Set to integer ticks by books with a tick size
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} id={self.order_id}, stop: {self.stop_price}, qty={self.quantity}, side={self.order_side}, asset={self.asset}>"
+
+    def __lt__(self, other):
+        if not isinstance(other, StopOrder):
+            return NotImplemented  # Avoid invalid comparisons
+        return self.timestamp < other.timestamp
+
+    def trigger(self):
+        """The (order type, order) released once the stop price trades"""
+        return "market", MarketOrder(self.order_id, self.quantity, self.order_side, self.asset)
+
+
+class StopLimitOrder(StopOrder):
+    """StopOrder releasing a limit order at price instead of a market order"""
+
+    __slots__ = ("price",)
+
+    def __init__(self, order_id, stop_price, price, quantity, order_side, asset):
+        super().__init__(order_id, stop_price, quantity, order_side, asset)
+        self.price = price
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} id={self.order_id}, stop: {self.stop_price}, price: {self.price}, qty={self.quantity}, side={self.order_side}, asset={self.asset}>"
+
+    def trigger(self):
+        return "limit", LimitOrder(self.order_id, self.price, self.quantity, self.order_side, self.asset)
+
+
+class CompactLimitOrder(LimitOrder):
+    """LimitOrder with an integer arrival sequence as timestamp and interned side/asset.
+
+    Same constructor as LimitOrder, so it can be registered in OrderFactory
+    in its place. Skips the datetime formatting and the per order strings.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, order_id, price, quantity, order_side, asset):
+        self.order_id = order_id
+        self.price = price
+        self.price_ticks = price
+        self.quantity = quantity
+        self.order_side = sys.intern(order_side)
+        self.asset = sys.intern(asset)
+        self.timestamp = next(_order_sequence)
+
+
+class CompactMarketOrder(MarketOrder):
+    """MarketOrder with an integer arrival sequence as timestamp and interned side/asset"""
+
+    __slots__ = ()
+
+    def __init__(
+        self, order_id, quantity, order_side, asset, partial_fill_behavior="cancel", fallback_price = None,
+    ):
+        self.order_id = order_id
+        self.quantity = quantity
+        self.order_side = sys.intern(order_side)
+        self.asset = sys.intern(asset)
+        self.timestamp = next(_order_sequence)
+        self.partial_fill_behavior = partial_fill_behavior
+        self.fallback_price = fallback_price
@@ -0,0 +1,178 @@
+import heapq
+import logging
+import multiprocessing
+import zlib
+from core.engine import MatchingEngine
+from core.interfaces import TradeManagerInterface, MatchingStrategy
+from core.orderbook import HeapOrderBook
+from core.trades import Trade
+from services.trade_manager import DiscardTradeManager
+from utils.logger import logger
+
+
+def shard_of(asset, shard_count):
+    """Owning shard of an asset, stable across processes and runs (unlike hash())"""
+    return zlib.crc32(asset.encode()) % shard_count
+
+
+def _shardWorker(connection, strategies, book_class, book_options, log_level):
+    """Worker process loop: match every batch it receives and send back its trades and rejects.
+
+    An order that raises is rejected on its own, keeping the trades it made
+    before the error, and the loop goes on with the rest of the batch.
+    """
+    logger.setLevel(log_level)
+    engine = MatchingEngine(DiscardTradeManager(), strategies, book_class, **book_options)
+    while True:
+        batch = connection.recv()
+        if batch is None:
+            break
+        results = []
+        rejects = []
+        for seq, order_type, order in batch:
+            trades = []
+            try:
+                if order_type is None:
+                    asset, order_id = order
+                    engine.removeOrder(asset, order_id)
+                else:
+                    engine.getBook(order.asset).addOrders(((order_type, order),), trades)
+            except Exception as error:
+                rejects.append((seq, order[1] if order_type is None else order.order_id, str(error)))
+            for trade in trades:
+                results.append(
+                    (seq, trade.buy_order_id, trade.sell_order_id, trade.execution_price, trade.filled_quantity, trade.asset)
+                )
+        connection.send((results, rejects))
+    connection.close()
+
+
+class ShardedMatchingEngine:
+    """Matching spread over worker processes, each owning the books of a subset of assets.
+
+    Assets are assigned to shards by a stable hash. The gateway tags every
+    order and cancel with a global sequence number, buffers them per shard
+    and sends them over a pipe in batches of batch_size. Each shard only ever
+    has one batch in flight, so neither side can block the other on a full
+    pipe. drain() waits for every shard and merges their trades back into one
+    stream ordered by the sequence of the order that produced them, so the
+    output is the same for any number of workers.
+
+    Orders that fail in a worker are rejected without stopping it; drain()
+    collects them in rejects as (order_id, reason), in sequence order.
+
+    Orders are pickled to the workers: the objects passed in are not updated.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        trade_manager: TradeManagerInterface,
+        strategies: dict[str, MatchingStrategy],
+        book_class=HeapOrderBook,
+        batch_size: int = 1024,
+        log_level=logging.WARNING,
+        start_method: str | None = None,
+        **book_options,
+    ):
+        self.trade_manager = trade_manager
+        self.batch_size = batch_size
+        self.sequence = 0
+        context = multiprocessing.get_context(start_method)
+
+        self.connections = []
+        self.processes = []
+        for _ in range(workers):
+            gateway_end, worker_end = context.Pipe()
+            process = context.Process(
+                target=_shardWorker,
+                args=(worker_end, strategies, book_class, book_options, log_level),
+                daemon=True,
+            )
+            process.start()
+            worker_end.close()
+            self.connections.append(gateway_end)
+            self.processes.append(process)
+
+        self.buffers = [[] for _ in range(workers)]
+        self.in_flight = [False] * workers
+        self.results = []  # Trade lists received from the shards, each sorted by sequence
+        self.reject_results = []  # Reject lists received from the shards, each sorted by sequence
+        self.rejects = []  # (order_id, reason) of every rejected order, filled in by drain()
+
+    def addOrder(self, order_type, order):
+        self._enqueue(order.asset, (self.sequence, order_type, order))
+
+    def addOrders(self, orders):
+        for order_type, order in orders:
+            self._enqueue(order.asset, (self.sequence, order_type, order))
+
+    def removeOrder(self, asset, order_id: int):
+        self._enqueue(asset, (self.sequence, None, (asset, order_id)))
+
+    def _enqueue(self, asset, message):
+        self.sequence += 1
+        shard = shard_of(asset, len(self.connections))
+        buffer = self.buffers[shard]
+        buffer.append(message)
+        if len(buffer) >= self.batch_size:
+            self._send(shard)
+
+    def _send(self, shard):
+        if self.in_flight[shard]:
+            self._receive(shard)
+        self.connections[shard].send(self.buffers[shard])
+        self.buffers[shard] = []
+        self.in_flight[shard] = True
+
+    def _receive(self, shard):
+        results, rejects = self.connections[shard].recv()
+        self.results.append(results)
+        if rejects:
+            self.reject_results.append(rejects)
+        self.in_flight[shard] = False
+
+    def drain(self):
+        """Wait for all buffered orders to be matched and return their trades in sequence order.
+
+        The trades are also recorded in the trade manager, and the orders
+        rejected by the shards are added to rejects.
+        """
+        for shard, buffer in enumerate(self.buffers):
+            if buffer:
+                self._send(shard)
+        for shard, in_flight in enumerate(self.in_flight):
+            if in_flight:
+                self._receive(shard)
+
+        reject_results, self.reject_results = self.reject_results, []
+        for _, order_id, reason in heapq.merge(*reject_results):
+            logger.warning("Rejected order %s: %s", order_id, reason)
+            self.rejects.append((order_id, reason))
+
+        results, self.results = self.results, []
+        trades = []
+        # All trades of one order come from one batch, and merge keeps their order
+        for result in heapq.merge(*results, key=lambda row: row[0]):
+            trade = Trade(*result[1:])
+            self.trade_manager.record_trade(trade)
+            trades.append(trade)
+        return trades
+
+    def close(self):
+        """Stop the workers; trades of batches still in flight are kept for drain()"""
+        for shard, in_flight in enumerate(self.in_flight):
+            if in_flight:
+                self._receive(shard)
+        for connection in self.connections:
+            if not connection.closed:
+                connection.send(None)
+                connection.close()
+        for process in self.processes:
+            process.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,133 @@
+import heapq
+import itertools
+import struct
+import sys
+from core.orders import LimitOrder
+from core.orderbook import HeapOrderBook
+
+MAGIC = b"OBSN"
+FORMAT_VERSION = 2
+# magic, format version, next arrival sequence, bids, asks, asset length, tick size length, lot size (-1 for none),
+# last trade price, last trade price flags
+HEADER = struct.Struct("<4sHqqqHHqdB")
+# arrival sequence, order id, quantity, price, price ticks, flags
+ORDER = struct.Struct("<qqqdqB")
+PRICE_IS_INT = 1
+PRICE_IS_SET = 2  # Only in the header, the book may not have traded yet
+
+
+def save_snapshot(book: HeapOrderBook, stream):
+    """Write the resting state of a HeapOrderBook to a binary stream.
+
+    Orders are written in heap layout with their arrival sequence, so a load
+    gets valid heaps back without comparing a single order. Dead entries are
+    left out, the last trade price is kept for the stops placed after a
+    load. Order ids must fit in 64 bit ints. Pending stop orders and
+    iceberg hidden quantity can't be held, so a book with any is refused.
+    """
+    if book.stops.orders:
+        raise ValueError(f"Book has {len(book.stops.orders)} pending stop orders, which snapshots can't hold")
+    next_sequence = next(book.sequence)
+    book.sequence = itertools.count(next_sequence)
+
+    heaps = {}
+    for order_side, heap in book.heaps.items():
+        if book.dead_orders[order_side]:
+            heap = [entry for entry in heap if entry[2].quantity > 0]
+            heapq.heapify(heap)
+        heaps[order_side] = heap
+
+    asset = book.asset.encode()
+    tick_size = str(book.price_grid.tick_size).encode() if book.price_grid.tick_size is not None else b""
+    lot_size = book.price_grid.lot_size if book.price_grid.lot_size is not None else -1
+    last_price = book.last_trade_price
+    last_price_flags = 0
+    if last_price is not None:
+        last_price_flags = PRICE_IS_SET | (PRICE_IS_INT if isinstance(last_price, int) else 0)
+    stream.write(
+        HEADER.pack(
+            MAGIC, FORMAT_VERSION, next_sequence, len(heaps["buy"]), len(heaps["sell"]),
+            len(asset), len(tick_size), lot_size, last_price or 0, last_price_flags,
+        )
+    )
+    stream.write(asset)
+    stream.write(tick_size)
+
+    has_ticks = bool(tick_size)
+    for order_side in ("buy", "sell"):
+        records = bytearray(ORDER.size * len(heaps[order_side]))
+        offset = 0
+        for sequence, order in ((entry[1], entry[2]) for entry in heaps[order_side]):
+            if order.hidden_quantity:
+                raise ValueError(f"Order: {order.order_id} has hidden quantity, which snapshots can't hold")
+            ORDER.pack_into(
+                records,
+                offset,
+                sequence,
+                order.order_id,
+                order.quantity,
+                order.price,
+                order.price_ticks if has_ticks else 0,
+                PRICE_IS_INT if isinstance(order.price, int) else 0,
+            )
+            offset += ORDER.size
+        stream.write(records)
+
+
+def load_snapshot(stream, trade_manager, strategies, **book_options):
+    """Build a HeapOrderBook from a snapshot written by save_snapshot.
+
+    No order goes through matching or the market data feed. Restored orders
+    are plain LimitOrders whose timestamp is their arrival sequence, and the
+    tick and lot size are the ones of the saved book.
+    """
+    (
+        magic, version, next_sequence, bids, asks, asset_length, tick_length, lot_size, last_price, last_price_flags
+    ) = HEADER.unpack(stream.read(HEADER.size))
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("Not an order book snapshot, or an unsupported version")
+    asset = stream.read(asset_length).decode()
+    tick_size = stream.read(tick_length).decode() or None
+
+    book = HeapOrderBook(
+        asset,
+        trade_manager,
+        strategies,
+        tick_size=tick_size,
+        lot_size=lot_size if lot_size >= 0 else None,
+        **book_options,
+    )
+    book.sequence = itertools.count(next_sequence)
+    if last_price_flags & PRICE_IS_SET:
+        book.last_trade_price = int(last_price) if last_price_flags & PRICE_IS_INT else last_price
+    has_ticks = tick_size is not None
+    asset = sys.intern(asset)
+    new_order = LimitOrder.__new__
+    order_map = book.order_map
+    depth_cache = book.depth_cache
+
+    for order_side, count in (("buy", bids), ("sell", asks)):
+        order_side = sys.intern(order_side)
+        heap = book.heaps[order_side]
+        append = heap.append
+        sign = -1 if order_side == "buy" else 1
+        for sequence, order_id, quantity, price, price_ticks, flags in ORDER.iter_unpack(
+            stream.read(ORDER.size * count)
+        ):
+            if flags & PRICE_IS_INT:
+                price = int(price)
+            if not has_ticks:
+                price_ticks = price
+            order = new_order(LimitOrder)
+            order.order_id = order_id
+            order.quantity = quantity
+            order.order_side = order_side
+            order.asset = asset
+            order.timestamp = sequence
+            order.price = price
+            order.price_ticks = price_ticks
+            append((sign * price_ticks, sequence, order))
+            order_map[order_id] = order
+            if depth_cache is not None:
+                depth_cache.add(order_side, price_ticks, price, quantity)
+    return book
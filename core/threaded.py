@@ -0,0 +1,120 @@
+import queue
+import threading
+from core.depth import BookSnapshot
+from core.interfaces import TradeManagerInterface, MatchingStrategy
+from core.orderbook import HeapOrderBook
+from utils.logger import logger
+
+_STOP = object()
+
+
+class ThreadedOrderBook:
+    """A HeapOrderBook owned by one matcher thread, read through published snapshots.
+
+    addOrder, removeOrder and modifyOrder only put a command on a bounded
+    queue; the matcher thread is the single writer of the book and, after
+    each command, publishes the book's versioned BookSnapshot by assigning
+    it to self.snapshot. The snapshot is an immutable tuple and the
+    assignment is one atomic reference swap, so getBid, getAsk, listAsk,
+    listBid and getSnapshot take no lock, never see a book mid match and
+    never hold the matcher up. Readers see the state as of the last
+    finished command; flush() waits for everything queued so far. A command
+    that raises is logged and dropped; once the thread is stopped, by
+    close() or otherwise, queuing and flush() raise RuntimeError.
+    """
+
+    POLL_INTERVAL = 0.1  # Seconds between checks that the matcher thread still runs, while blocked
+
+    def __init__(
+        self,
+        asset,
+        trade_manager: TradeManagerInterface,
+        strategies: dict[str, MatchingStrategy],
+        depth_levels: int = 10,
+        queue_size: int = 65536,
+        **book_options,
+    ):
+        self.book = HeapOrderBook(asset, trade_manager, strategies, depth_levels=depth_levels, **book_options)
+        self.snapshot = self.book.getSnapshot()
+        self.commands = queue.Queue(queue_size)
+        self.thread = threading.Thread(target=self._match, name=f"matcher-{asset}", daemon=True)
+        self.thread.start()
+
+    def addOrder(self, order_type, order):
+        self._put((self.book.addOrder, (order_type, order)))
+
+    def removeOrder(self, order_id: int):
+        self._put((self.book.removeOrder, (order_id,)))
+
+    def modifyOrder(self, order_id: int, new_quantity: int, new_price=None):
+        self._put((self.book.modifyOrder, (order_id, new_quantity, new_price)))
+
+    def flush(self):
+        """Block until every command queued before this call was matched and published"""
+        done = threading.Event()
+        self._put((done.set, ()))
+        while not done.wait(self.POLL_INTERVAL):
+            self._checkAlive()
+
+    def _put(self, command):
+        """Queue a command, waiting while the queue is full, as long as the matcher runs"""
+        self._checkAlive()
+        while True:
+            try:
+                self.commands.put(command, timeout=self.POLL_INTERVAL)
+                return
+            except queue.Full:
+                self._checkAlive()
+
+    def _checkAlive(self):
+        if not self.thread.is_alive():
+            raise RuntimeError(f"Matcher thread of {self.book.asset} is stopped")
+
+    def close(self):
+        """Match what is still queued, then stop the matcher thread"""
+        if self.thread.is_alive():
+            self.commands.put(_STOP)
+            self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _match(self):
+        book = self.book
+        commands = self.commands
+        while True:
+            command = commands.get()
+            if command is _STOP:
+                break
+            method, arguments = command
+            try:
+                method(*arguments)
+            except Exception as error:
+                # Drop the failing command only, the thread must keep serving the queue
+                logger.error("Rejected %s%s: %r", method.__name__, arguments, error)
+            self.snapshot = book.getSnapshot()
+
+    # Readers: each call reads self.snapshot once and works on that version only. They
+    # don't log, so they never wait on the handler locks and I/O the matcher logs through.
+
+    def getSnapshot(self) -> BookSnapshot:
+        return self.snapshot
+
+    def getAsk(self):
+        asks = self.snapshot.asks
+        return asks[0][0] if asks else None
+
+    def getBid(self):
+        bids = self.snapshot.bids
+        return bids[0][0] if bids else None
+
+    def listAsk(self, depth: int):
+        """First (depth) ask levels as (price, quantity, order count), up to depth_levels"""
+        return self.snapshot.asks[:depth]
+
+    def listBid(self, depth: int):
+        """First (depth) bid levels as (price, quantity, order count), up to depth_levels"""
+        return self.snapshot.bids[:depth]
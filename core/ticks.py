@@ -0,0 +1,43 @@
+from decimal import Decimal
+
+
+class PriceGrid:
+    """Tick and lot size of the asset traded in a book.
+
+    With a tick size, prices are turned into integer ticks when orders enter
+    the book, so matching compares and sums ints; prices are only converted
+    back for reporting. Without one, ticks are just the raw prices.
+    """
+
+    def __init__(self, tick_size: float | None = None, lot_size: int | None = None):
+        # Decimal of the written value, so a tick of 0.01 is exactly one cent
+        self.tick_size = Decimal(str(tick_size)) if tick_size is not None else None
+        self.lot_size = lot_size
+
+    def to_ticks(self, price):
+        if self.tick_size is None:
+            # Checked here, before a book stores anything of the order
+            if not isinstance(price, (int, float, Decimal)):
+                raise ValueError(f"Price: {price!r} is not a number")
+            return price
+        ticks, remainder = divmod(Decimal(str(price)), self.tick_size)
+        if remainder:
+            raise ValueError(f"Price: {price} is not a multiple of tick size {self.tick_size}")
+        return int(ticks)
+
+    def to_price(self, ticks):
+        if self.tick_size is None:
+            return ticks
+        return float(ticks * self.tick_size)
+
+    def average_price(self, price_quantity, quantity):
+        """Average price from a sum of quantity * ticks, rounded only once"""
+        if not quantity:
+            return 0
+        if self.tick_size is None:
+            return price_quantity / quantity
+        return float(price_quantity * self.tick_size / quantity)
+
+    def check_quantity(self, quantity):
+        if self.lot_size is not None and quantity % self.lot_size:
+            raise ValueError(f"Quantity: {quantity} is not a multiple of lot size {self.lot_size}")
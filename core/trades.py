@@ -1,6 +1,13 @@
+import itertools
+import sys
+
+_trade_sequence = itertools.count(1)
 
 
 class Trade:
+
+    __slots__ = ("buy_order_id", "sell_order_id", "execution_price", "filled_quantity", "asset")
+
     def __init__(
         self,
         buy_order_id: int,
@@ -17,3 +24,24 @@ class Trade:
 
     def __repr__(self):
         return f"<{self.__class__.__name__} (buy_order_id={self.buy_order_id}, sell_order_id={self.sell_order_id}, price={self.execution_price}, qty={self.filled_quantity}, asset={self.asset})>"
+
+
+class CompactTrade(Trade):
+    """Trade with an interned asset and an integer sequence number (seq)"""
+
+    __slots__ = ("seq",)
+
+    def __init__(
+        self,
+        buy_order_id: int,
+        sell_order_id: int,
+        execution_price: float,
+        quantity: int,
+        asset: str,
+    ):
+        self.buy_order_id = buy_order_id
+        self.sell_order_id = sell_order_id
+        self.execution_price = execution_price
+        self.filled_quantity = quantity
+        self.asset = sys.intern(asset)
+        self.seq = next(_trade_sequence)
@@ -0,0 +1,68 @@
+import heapq
+import itertools
+from core.orders import LimitOrder
+
+
+class StopIndex:
+    """Pending stop orders of a book, indexed by stop price.
+
+    Buy stops fire once a trade prints at or above their stop, sell stops at
+    or below, so each side is a heap with the next stop to fire on top:
+    (stop ticks, sequence, order) for buys and (-stop ticks, ...) for sells.
+    The book checks them against its last trade price after every incoming
+    order that moved it, and that only pops the stops it fires. Cancelled
+    stops leave their heap entry behind and are skipped when they surface.
+    """
+
+    def __init__(self):
+        self.heaps = {"buy": [], "sell": []}
+        self.orders = {}  # Pending stops by ID
+        self.sequence = itertools.count()
+        self.last_price = None  # Trade price the stops were last checked against
+
+    def add(self, order):
+        self.orders[order.order_id] = order
+        if order.order_side == "buy":
+            heapq.heappush(self.heaps["buy"], (order.stop_ticks, next(self.sequence), order))
+        else:
+            heapq.heappush(self.heaps["sell"], (-order.stop_ticks, next(self.sequence), order))
+        # A stop already beyond the last trade price fires on the next check
+        self.last_price = None
+
+    def remove(self, order_id: int):
+        """Cancel a pending stop, True if there was one"""
+        return self.orders.pop(order_id, None) is not None
+
+    def triggered(self, last_ticks):
+        """Pop the stops a trade at last_ticks fires, buys then sells, each in stop price then arrival order"""
+        fired = []
+        orders = self.orders
+        buys = self.heaps["buy"]
+        while buys and buys[0][0] <= last_ticks:
+            order = heapq.heappop(buys)[2]
+            if orders.get(order.order_id) is order:
+                del orders[order.order_id]
+                fired.append(order)
+        sells = self.heaps["sell"]
+        while sells and -sells[0][0] >= last_ticks:
+            order = heapq.heappop(sells)[2]
+            if orders.get(order.order_id) is order:
+                del orders[order.order_id]
+                fired.append(order)
+        return fired
+
+    def release(self, book):
+        """Send the stops fired by the book's last trade price through its strategies.
+
+        The released orders can trade at new prices and fire more stops, so
+        this repeats until the last trade price stops moving.
+        """
+        while self.orders and book.last_trade_price != self.last_price:
+            self.last_price = book.last_trade_price
+            for stop in self.triggered(book.price_grid.to_ticks(self.last_price)):
+                order_type, order = stop.trigger()
+                if isinstance(order, LimitOrder):
+                    book.restOrder(order)
+                strategy = book.strategies.get(order_type)
+                if strategy is not None:
+                    strategy.match(book, order)
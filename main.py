@@ -3,6 +3,7 @@ from core.factory import OrderFactory
 from core.orders import LimitOrder, MarketOrder
 from services.trade_manager import TradeManager
 from core.orderbook import HeapOrderBook
+from utils.logger import configure_logging
 
 
 def createOrderBook():
@@ -69,4 +70,5 @@ def createOrderBook():
     # ob.listBid(10)
 
 
+configure_logging()
 createOrderBook()
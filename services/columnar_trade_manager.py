@@ -0,0 +1,116 @@
+from array import array
+from operator import mul
+import time
+from core.interfaces import TradeManagerInterface
+from core.trades import Trade
+from utils.helpers import print_line
+from utils.logger import logger
+
+
+class ColumnarTradeManager(TradeManagerInterface):
+    """Trade history kept as typed columns instead of a list of Trade objects.
+
+    Each trade is one row across array.array columns (order ids, price,
+    quantity, asset code and wall clock time in ns), so recording a trade
+    appends raw C values and keeps no Python object alive. Columns can be
+    exported without copying through memoryview, e.g. to numpy.frombuffer.
+    """
+
+    COLUMNS = ("buy_order_id", "sell_order_id", "price", "quantity", "asset", "timestamp_ns")
+
+    def __init__(self):
+        self.buy_order_id = array("q")
+        self.sell_order_id = array("q")
+        self.price = array("d")
+        self.quantity = array("q")
+        self.asset = array("l")  # Code into self.assets
+        self.timestamp_ns = array("q")
+        self.assets = []
+        self.asset_codes = {}
+
+    def __len__(self):
+        return len(self.price)
+
+    def record_trade(self, trade):
+        self.record(
+            trade.buy_order_id,
+            trade.sell_order_id,
+            trade.execution_price,
+            trade.filled_quantity,
+            trade.asset,
+        )
+
+    def record(self, buy_order_id, sell_order_id, price, quantity, asset):
+        """Append one trade from its raw fields"""
+        code = self.asset_codes.get(asset)
+        if code is None:
+            code = self.asset_codes[asset] = len(self.assets)
+            self.assets.append(asset)
+        self.buy_order_id.append(buy_order_id)
+        self.sell_order_id.append(sell_order_id)
+        self.price.append(price)
+        self.quantity.append(quantity)
+        self.asset.append(code)
+        self.timestamp_ns.append(time.time_ns())
+
+    def trade(self, index):
+        """Build the Trade of one row, only for reporting"""
+        return Trade(
+            self.buy_order_id[index],
+            self.sell_order_id[index],
+            self.price[index],
+            self.quantity[index],
+            self.assets[self.asset[index]],
+        )
+
+    @property
+    def trades(self):
+        """All rows as Trade objects, like TradeManager.trades (allocates one per trade)"""
+        return [self.trade(index) for index in range(len(self))]
+
+    def list_trades(self):
+
+        if len(self):
+            logger.info("Trade List:")
+            for index in range(len(self)):
+                logger.info("index: %s, trade: %s", index, self.trade(index))
+                print_line()
+
+        else:
+            logger.info("Trade List are empty!")
+            print_line()
+
+    def columns(self):
+        """Zero copy views of every column.
+
+        The arrays can't grow while a view is alive, so release the views
+        (or use them in a with block) before recording more trades.
+        """
+        return {name: memoryview(getattr(self, name)) for name in self.COLUMNS}
+
+    def volume(self, start=0, stop=None):
+        return sum(self.quantity[start:stop])
+
+    def vwap(self, start=0, stop=None):
+        """Volume weighted average price of the rows in [start, stop)"""
+        quantity = self.quantity[start:stop]
+        total_quantity = sum(quantity)
+        if not total_quantity:
+            return 0
+        return sum(map(mul, self.price[start:stop], quantity)) / total_quantity
+
+    def volume_by_bucket(self, bucket_ns: int):
+        """Traded quantity per time bucket, keyed by the bucket start in ns"""
+        volumes = {}
+        for timestamp, quantity in zip(self.timestamp_ns, self.quantity):
+            bucket = timestamp - timestamp % bucket_ns
+            volumes[bucket] = volumes.get(bucket, 0) + quantity
+        return volumes
+
+    def trades_for_order(self, order_id: int):
+        """Row indexes of the trades an order took part in, on either side"""
+        return [
+            index
+            for index, (buy_order_id, sell_order_id) in enumerate(zip(self.buy_order_id, self.sell_order_id))
+            if buy_order_id == order_id or sell_order_id == order_id
+        ]
@@ -0,0 +1,234 @@
+"""Asyncio gateway taking newline delimited JSON orders over TCP or a Unix socket.
+
+Run a server from the project root:
+
+    python -m services.order_gateway --port 9000
+    python -m services.order_gateway --path /tmp/orderbook.sock
+
+Every line is one message, either an order for OrderFactory:
+
+    {"type": "limit", "order_id": 1, "price": 100, "quantity": 5, "order_side": "buy", "asset": "BTC-USD"}
+
+(types limit, market, ioc, fok, post_only, iceberg with display_quantity,
+stop with stop_price, stop_limit with stop_price and price), or a cancel:
+
+    {"type": "cancel", "order_id": 1, "asset": "BTC-USD"}
+
+The client gets back one line per event: {"event": "ack", ...} once the
+order was matched or cancelled, or {"event": "reject", ...} when the message
+can't be processed, then one {"event": "trade", ...} per trade any of its
+orders took part in, incoming or resting. A rejected order still reports the
+trades it made before the error.
+"""
+import argparse
+import asyncio
+import json
+from core.engine import MatchingEngine
+from core.factory import OrderFactory
+from core.matching import (
+    LimitOrderMatching,
+    MarketOrderMatching,
+    IOCOrderMatching,
+    FOKOrderMatching,
+    PostOnlyOrderMatching,
+    StopOrderMatching,
+    IcebergOrderMatching,
+)
+from core.orders import (
+    LimitOrder, MarketOrder, IOCOrder, FOKOrder, PostOnlyOrder, StopOrder, StopLimitOrder, IcebergOrder
+)
+from services.trade_manager import TradeManager
+from utils.logger import logger
+
+
+class OrderGateway:
+    """Feeds orders from socket clients to a MatchingEngine.
+
+    Each asset gets one bounded queue and one task matching its orders, the
+    single writer of that book. Client readers decode messages and wait on
+    the queue when it is full, which stops them reading from the socket, so
+    a burst is pushed back to the clients instead of growing memory.
+    """
+
+    def __init__(self, engine: MatchingEngine, queue_size: int = 1024):
+        self.engine = engine
+        self.queue_size = queue_size
+        self.queues = {}
+        self.tasks = {}
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self._handleClient, path=path)
+        else:
+            self.server = await asyncio.start_server(self._handleClient, host, port)
+        return self.server
+
+    @property
+    def address(self):
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        self.tasks.clear()
+        self.queues.clear()
+
+    def _bookQueue(self, asset):
+        queue = self.queues.get(asset)
+        if queue is None:
+            queue = self.queues[asset] = asyncio.Queue(self.queue_size)
+            self.tasks[asset] = asyncio.create_task(self._matchBook(asset, queue))
+        return queue
+
+    async def _handleClient(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                    order_type = message.pop("type")
+                    if order_type == "cancel":
+                        order = (message["asset"], message["order_id"])
+                        asset = message["asset"]
+                    else:
+                        order = OrderFactory.create_order(order_type, **message)
+                        order.validate()
+                        asset = order.asset
+                except (ValueError, TypeError, KeyError, AttributeError) as error:
+                    self._send(writer, {"event": "reject", "reason": str(error)})
+                    continue
+                await self._bookQueue(asset).put((writer, order_type, order))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _matchBook(self, asset, queue):
+        book = self.engine.getBook(asset)
+        owners = {}  # Writer of the client that placed each live order, by ID
+        while True:
+            writer, order_type, order = await queue.get()
+            if order_type == "cancel":
+                try:
+                    book.removeOrder(order[1])
+                except Exception as error:
+                    logger.error("Rejected cancel %s: %r", order[1], error)
+                    self._send(writer, {"event": "reject", "order_id": order[1], "reason": str(error)})
+                    continue
+                owners.pop(order[1], None)
+                self._send(writer, {"event": "ack", "order_id": order[1], "status": "cancelled"})
+                continue
+            if order.order_id in book.order_map or order.order_id in book.stops.orders:
+                self._send(
+                    writer, {"event": "reject", "order_id": order.order_id, "reason": "Order ID is already live"}
+                )
+                continue
+            owners[order.order_id] = writer
+            trades = []
+            try:
+                book.addOrders(((order_type, order),), trades)
+            except Exception as error:
+                # Reject this order only, the task must keep matching the asset's queue
+                logger.error("Rejected order %s: %r", order.order_id, error)
+                self._send(writer, {"event": "reject", "order_id": order.order_id, "reason": str(error)})
+            else:
+                self._send(writer, {"event": "ack", "order_id": order.order_id, "status": "accepted"})
+            self._reportTrades(trades, owners)
+
+            # Forget the owners of orders that no longer rest or wait on a stop
+            order_ids = {order.order_id}
+            for trade in trades:
+                order_ids.update((trade.buy_order_id, trade.sell_order_id))
+            for order_id in order_ids:
+                if order_id not in book.order_map and order_id not in book.stops.orders:
+                    owners.pop(order_id, None)
+
+    def _reportTrades(self, trades, owners):
+        """Send each trade to the clients that placed its buy and sell orders"""
+        for trade in trades:
+            event = {
+                "event": "trade",
+                "buy_order_id": trade.buy_order_id,
+                "sell_order_id": trade.sell_order_id,
+                "price": trade.execution_price,
+                "quantity": trade.filled_quantity,
+                "asset": trade.asset,
+            }
+            buyer = owners.get(trade.buy_order_id)
+            seller = owners.get(trade.sell_order_id)
+            if buyer is not None:
+                self._send(buyer, event)
+            if seller is not None and seller is not buyer:
+                self._send(seller, event)
+
+    @staticmethod
+    def _send(writer, event):
+        if not writer.is_closing():
+            writer.write(json.dumps(event).encode() + b"\n")
+
+
+class OrderGatewayClient:
+    """Minimal client for the gateway, for scripts and tests"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=None, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def send(self, message):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+
+    async def receive(self):
+        return json.loads(await self.reader.readline())
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def serve(host, port, path):
+    OrderFactory.register_order_type("limit", LimitOrder)
+    OrderFactory.register_order_type("market", MarketOrder)
+    OrderFactory.register_order_type("ioc", IOCOrder)
+    OrderFactory.register_order_type("fok", FOKOrder)
+    OrderFactory.register_order_type("post_only", PostOnlyOrder)
+    OrderFactory.register_order_type("stop", StopOrder)
+    OrderFactory.register_order_type("stop_limit", StopLimitOrder)
+    OrderFactory.register_order_type("iceberg", IcebergOrder)
+    strategies = {
+        "limit": LimitOrderMatching(),
+        "market": MarketOrderMatching(),
+        "ioc": IOCOrderMatching(),
+        "fok": FOKOrderMatching(),
+        "post_only": PostOnlyOrderMatching(),
+        "stop": StopOrderMatching(),
+        "stop_limit": StopOrderMatching(),
+        "iceberg": IcebergOrderMatching(),
+    }
+    gateway = OrderGateway(MatchingEngine(TradeManager(), strategies, log_mode="queue"))
+    server = await gateway.start(host, port, path)
+    logger.info("Order gateway listening on %s", gateway.address)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--path", help="Unix socket path, instead of TCP")
+    arguments = parser.parse_args()
+    asyncio.run(serve(arguments.host, arguments.port, arguments.path))
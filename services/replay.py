@@ -0,0 +1,197 @@
+"""Deterministic replay of an order file through the matching engine.
+
+Run from the project root:
+
+    python -m services.replay orders.csv --trades trades.csv --report report.json
+    python -m services.replay orders.csv --to-binary orders.bin
+
+Input is either CSV with the header
+
+    type,order_id,order_side,price,quantity,asset
+
+where type is limit, market or cancel (cancels only need order_id and
+asset), or the fixed width binary format written by --to-binary (.bin).
+Orders are streamed through a generator pipeline with logging off, so
+files larger than memory replay in bounded memory; only the book itself
+grows. The trades file holds no clock values, so the same input always
+gives a byte identical output.
+"""
+import argparse
+import csv
+import json
+import logging
+import struct
+import sys
+import time
+from core.engine import MatchingEngine
+from core.ladder import LadderOrderBook
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orderbook import HeapOrderBook
+from core.orders import LimitOrder, MarketOrder
+from services.trade_manager import DiscardTradeManager
+from utils.histogram import LatencyHistogram
+from utils.logger import logger
+
+# type, side, order id, price, quantity, asset (utf-8, zero padded)
+BINARY_ORDER = struct.Struct("<BBqdq16s")
+ORDER_TYPES = ("limit", "market", "cancel")
+SIDES = ("buy", "sell")
+CSV_FIELDS = ["type", "order_id", "order_side", "price", "quantity", "asset"]
+TRADE_FIELDS = ["buy_order_id", "sell_order_id", "price", "quantity", "asset"]
+BOOK_CLASSES = {"heap": HeapOrderBook, "ladder": LadderOrderBook}
+
+
+def _number(text):
+    return float(text) if "." in text or "e" in text.lower() else int(text)
+
+
+def read_csv(path):
+    """Yield (order_type, order_id, order_side, price, quantity, asset) rows"""
+    with open(path, newline="") as orders_file:
+        for row in csv.DictReader(orders_file):
+            price = row["price"]
+            quantity = row["quantity"]
+            yield (
+                row["type"],
+                int(row["order_id"]),
+                row["order_side"] or None,
+                _number(price) if price else None,
+                int(quantity) if quantity else None,
+                row["asset"],
+            )
+
+
+def read_binary(path, chunk_records=4096):
+    """Yield the same rows as read_csv from a binary order file"""
+    with open(path, "rb") as orders_file:
+        while chunk := orders_file.read(BINARY_ORDER.size * chunk_records):
+            for type_code, side_code, order_id, price, quantity, asset in BINARY_ORDER.iter_unpack(chunk):
+                yield (
+                    ORDER_TYPES[type_code],
+                    order_id,
+                    SIDES[side_code],
+                    price,
+                    quantity,
+                    asset.rstrip(b"\0").decode(),
+                )
+
+
+def write_binary(rows, path):
+    with open(path, "wb") as orders_file:
+        for order_type, order_id, order_side, price, quantity, asset in rows:
+            orders_file.write(
+                BINARY_ORDER.pack(
+                    ORDER_TYPES.index(order_type),
+                    SIDES.index(order_side) if order_side else 0,
+                    order_id,
+                    price or 0,
+                    quantity or 0,
+                    asset.encode(),
+                )
+            )
+
+
+def read_orders(path):
+    return read_binary(path) if path.endswith(".bin") else read_csv(path)
+
+
+def replay(rows, trades_file, book_class=HeapOrderBook, **book_options):
+    """Match every row and write its trades, returning the run statistics"""
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    engine = MatchingEngine(DiscardTradeManager(), strategies, book_class, **book_options)
+    writer = csv.writer(trades_file, lineterminator="\n")
+    writer.writerow(TRADE_FIELDS)
+
+    latency = LatencyHistogram()
+    phases = {"read": 0, "decode": 0, "match": 0, "write": 0}
+    orders = trade_count = 0
+    clock = time.perf_counter_ns
+    rows = iter(rows)
+
+    level = logger.level
+    logger.setLevel(logging.CRITICAL + 1)
+    try:
+        while True:
+            start = clock()
+            row = next(rows, None)
+            if row is None:
+                break
+            decoded = clock()
+            order_type, order_id, order_side, price, quantity, asset = row
+            if order_type == "limit":
+                order = LimitOrder(order_id, price, quantity, order_side, asset)
+            elif order_type == "market":
+                order = MarketOrder(order_id, quantity, order_side, asset)
+            elif order_type != "cancel":
+                raise ValueError(f"Order type: '{order_type}' must be one of {', '.join(ORDER_TYPES)}")
+            matching = clock()
+            if order_type == "cancel":
+                engine.removeOrder(asset, order_id)
+                trades = ()
+            else:
+                trades = engine.getBook(asset).addOrders(((order_type, order),))
+            matched = clock()
+            for trade in trades:
+                writer.writerow(
+                    (trade.buy_order_id, trade.sell_order_id, trade.execution_price, trade.filled_quantity, trade.asset)
+                )
+            written = clock()
+
+            orders += 1
+            trade_count += len(trades)
+            latency.record(matched - matching)
+            phases["read"] += decoded - start
+            phases["decode"] += matching - decoded
+            phases["match"] += matched - matching
+            phases["write"] += written - matched
+    finally:
+        logger.setLevel(level)
+
+    elapsed_ns = sum(phases.values())
+    return {
+        "orders": orders,
+        "trades": trade_count,
+        "elapsed_s": elapsed_ns / 1e9,
+        "orders_per_s": orders / (elapsed_ns / 1e9) if elapsed_ns else 0,
+        "match_latency_ns": latency.summary(),
+        "phases_s": {phase: total / 1e9 for phase, total in phases.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("orders", help="CSV or .bin order file")
+    parser.add_argument("--trades", default="trades.csv", help="Trades output file")
+    parser.add_argument("--report", help="Write the run statistics as JSON")
+    parser.add_argument("--book", choices=sorted(BOOK_CLASSES), default="heap")
+    parser.add_argument("--tick-size", type=float)
+    parser.add_argument("--to-binary", metavar="PATH", help="Only convert the orders to the binary format")
+    arguments = parser.parse_args(argv)
+
+    if arguments.to_binary:
+        write_binary(read_orders(arguments.orders), arguments.to_binary)
+        return None
+
+    with open(arguments.trades, "w", newline="") as trades_file:
+        stats = replay(
+            read_orders(arguments.orders),
+            trades_file,
+            BOOK_CLASSES[arguments.book],
+            tick_size=arguments.tick_size,
+        )
+
+    latency = stats["match_latency_ns"]
+    print(f"orders: {stats['orders']}  trades: {stats['trades']}  {stats['orders_per_s']:,.0f} orders/s")
+    print(
+        f"match latency ns  p50: {latency['p50']}  p99: {latency['p99']}  "
+        f"p99.9: {latency['p99.9']}  max: {latency['max']}"
+    )
+    print("phases s  " + "  ".join(f"{phase}: {total:.3f}" for phase, total in stats["phases_s"].items()))
+    if arguments.report:
+        with open(arguments.report, "w") as report_file:
+            json.dump(stats, report_file, indent=2)
+    return stats
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
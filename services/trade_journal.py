@@ -0,0 +1,232 @@
+import bisect
+import mmap
+import os
+import struct
+import time
+from collections import namedtuple
+from core.interfaces import TradeManagerInterface
+from core.trades import Trade
+from utils.helpers import print_line
+from utils.logger import logger
+
+# seq, buy order id, sell order id, price, quantity, timestamp ns, asset (utf-8, zero padded)
+RECORD = struct.Struct("<qqqdqq16s")
+RECORD_SIZE = RECORD.size
+SEGMENT_PREFIX = "trades-"
+SEGMENT_SUFFIX = ".journal"
+
+JournalRecord = namedtuple(
+    "JournalRecord",
+    ["seq", "buy_order_id", "sell_order_id", "price", "quantity", "timestamp_ns", "asset"],
+)
+
+
+def _segment_paths(directory):
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+def _segment_path(directory, index):
+    return os.path.join(directory, f"{SEGMENT_PREFIX}{index:06d}{SEGMENT_SUFFIX}")
+
+
+def _written_records(buffer):
+    """Number of records written in a segment.
+
+    Segments are preallocated with zeros and seq starts at 1, so the written
+    records are the prefix with a non zero seq; found by binary search.
+    """
+    low, high = 0, len(buffer) // RECORD_SIZE
+    while low < high:
+        middle = (low + high) // 2
+        if RECORD.unpack_from(buffer, middle * RECORD_SIZE)[0]:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _decode(values):
+    seq, buy_order_id, sell_order_id, price, quantity, timestamp_ns, asset = values
+    return JournalRecord(
+        seq, buy_order_id, sell_order_id, price, quantity, timestamp_ns,
+        asset.rstrip(b"\0").decode(),
+    )
+
+
+class TradeJournal(TradeManagerInterface):
+    """Append only trade journal of fixed width binary records in memory mapped files.
+
+    Each segment file is preallocated for segment_records records and mapped
+    in memory, so recording a trade is a struct pack into the map. Dirty pages
+    are flushed to disk every flush_every records (None leaves it to the OS
+    and close()). A full segment is flushed and the next one is started.
+    Reopening a directory appends after the last record written.
+    """
+
+    def __init__(self, directory: str, segment_records: int = 1_000_000, flush_every: int | None = 1024):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.flush_every = flush_every
+        self.unflushed = 0
+        os.makedirs(directory, exist_ok=True)
+
+        segments = _segment_paths(directory)
+        self.segment_index = len(segments) - 1 if segments else 0
+        self.next_seq = 1
+        self._openSegment()
+        if self.position:
+            self.next_seq = RECORD.unpack_from(self.buffer, self.position - RECORD_SIZE)[0] + 1
+        elif self.segment_index:
+            with TradeJournalReader(directory) as reader:
+                self.next_seq = len(reader) + 1
+
+    def _openSegment(self):
+        path = _segment_path(self.directory, self.segment_index)
+        self.file = open(path, "a+b")
+        size = self.segment_records * RECORD_SIZE
+        if os.path.getsize(path) < size:
+            self.file.truncate(size)
+        self.buffer = mmap.mmap(self.file.fileno(), 0)
+        self.position = _written_records(self.buffer) * RECORD_SIZE
+
+    def _closeSegment(self):
+        self.buffer.flush()
+        self.buffer.close()
+        self.file.close()
+        self.unflushed = 0
+
+    def record_trade(self, trade):
+        self.record(
+            trade.buy_order_id,
+            trade.sell_order_id,
+            trade.execution_price,
+            trade.filled_quantity,
+            trade.asset,
+        )
+
+    def record(self, buy_order_id, sell_order_id, price, quantity, asset):
+        """Append one trade from its raw fields"""
+        if self.position + RECORD_SIZE > len(self.buffer):
+            self._closeSegment()
+            self.segment_index += 1
+            self._openSegment()
+
+        encoded_asset = asset.encode()
+        if len(encoded_asset) > 16:
+            raise ValueError(f"Asset: '{asset}' is longer than 16 bytes")
+        RECORD.pack_into(
+            self.buffer,
+            self.position,
+            self.next_seq,
+            buy_order_id,
+            sell_order_id,
+            price,
+            quantity,
+            time.time_ns(),
+            encoded_asset,
+        )
+        self.position += RECORD_SIZE
+        self.next_seq += 1
+
+        self.unflushed += 1
+        if self.flush_every is not None and self.unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self.buffer.flush()
+        self.unflushed = 0
+
+    def close(self):
+        if not self.file.closed:
+            self._closeSegment()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def list_trades(self):
+        self.flush()
+        with TradeJournalReader(self.directory) as reader:
+            if len(reader):
+                logger.info("Trade List:")
+                for record in reader:
+                    logger.info("seq: %s, trade: %s", record.seq, TradeJournalReader.toTrade(record))
+                    print_line()
+            else:
+                logger.info("Trade List are empty!")
+                print_line()
+
+
+class TradeJournalReader:
+    """Read only view over a trade journal directory.
+
+    Segments are memory mapped and records decoded on access, so iterating
+    or slicing never loads the journal in memory. Records written after the
+    reader was opened are not seen.
+    """
+
+    def __init__(self, directory: str):
+        self.files = []
+        self.buffers = []
+        self.counts = []
+        for path in _segment_paths(directory):
+            if not os.path.getsize(path):
+                continue
+            segment_file = open(path, "rb")
+            buffer = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.files.append(segment_file)
+            self.buffers.append(buffer)
+            self.counts.append(_written_records(buffer))
+        # Index of the first record of every segment, to locate a record in O(log segments)
+        self.starts = []
+        total = 0
+        for count in self.counts:
+            self.starts.append(total)
+            total += count
+        self.total = total
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        for buffer, count in zip(self.buffers, self.counts):
+            for offset in range(0, count * RECORD_SIZE, RECORD_SIZE):
+                yield _decode(RECORD.unpack_from(buffer, offset))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self.total))]
+        if index < 0:
+            index += self.total
+        if not 0 <= index < self.total:
+            raise IndexError("journal index out of range")
+        segment = bisect.bisect_right(self.starts, index) - 1
+        offset = (index - self.starts[segment]) * RECORD_SIZE
+        return _decode(RECORD.unpack_from(self.buffers[segment], offset))
+
+    @staticmethod
+    def toTrade(record):
+        return Trade(record.buy_order_id, record.sell_order_id, record.price, record.quantity, record.asset)
+
+    def trades(self):
+        """Trade objects for every record, streamed"""
+        for record in self:
+            yield self.toTrade(record)
+
+    def close(self):
+        for buffer in self.buffers:
+            buffer.close()
+        for segment_file in self.files:
+            segment_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
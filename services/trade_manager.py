@@ -1,3 +1,4 @@
+import logging
 from core.interfaces import TradeManagerInterface
 from utils.helpers import print_line
 from utils.logger import logger
@@ -10,9 +11,16 @@ class TradeManager(TradeManagerInterface):
 
     def record_trade(self, trade):
         self.trades.append(trade)
-        logger.info(f"Trade recorded: {trade}")
+        logger.info("Trade recorded: %s", trade)
         print_line()
 
+    def record_trades(self, trades):
+        self.trades.extend(trades)
+        if logger.isEnabledFor(logging.INFO):
+            for trade in trades:
+                logger.info("Trade recorded: %s", trade)
+                print_line()
+
     def list_trades(self):
 
         if self.trades:
@@ -24,3 +32,16 @@ class TradeManager(TradeManagerInterface):
         else:
             logger.info(f"Trade List are empty!")
             print_line()
+
+
+class DiscardTradeManager(TradeManagerInterface):
+    """Trade manager keeping nothing, for callers that take trades from addOrders"""
+
+    def record_trade(self, trade):
+        pass
+
+    def record_trades(self, trades):
+        pass
+
+    def list_trades(self):
+        pass
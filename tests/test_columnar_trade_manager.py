@@ -0,0 +1,53 @@
+import pytest
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orders import LimitOrder, MarketOrder
+from core.trades import Trade
+from core.orderbook import HeapOrderBook
+from services.columnar_trade_manager import ColumnarTradeManager
+
+
+@pytest.fixture
+def trade_manager():
+    trade_manager = ColumnarTradeManager()
+    trade_manager.record_trade(Trade(1, 2, 100.0, 5, "BTC-USD"))
+    trade_manager.record_trade(Trade(3, 2, 101.0, 15, "BTC-USD"))
+    trade_manager.record(3, 4, 102.0, 10, "ETH-USD")
+    return trade_manager
+
+
+def test_rows_and_queries(trade_manager):
+    assert len(trade_manager) == 3
+    assert trade_manager.volume() == 30
+    assert trade_manager.vwap() == pytest.approx((500 + 1515 + 1020) / 30)
+    assert trade_manager.vwap(0, 2) == pytest.approx(100.75)
+    assert trade_manager.trades_for_order(2) == [0, 1]
+    assert trade_manager.trades_for_order(3) == [1, 2]
+    assert trade_manager.trade(2).asset == "ETH-USD"
+    assert sum(trade_manager.volume_by_bucket(10**12).values()) == 30
+
+
+def test_columns_are_zero_copy_views(trade_manager):
+    columns = trade_manager.columns()
+    assert columns["price"].tolist() == [100.0, 101.0, 102.0]
+    assert columns["price"].obj is trade_manager.price
+
+    with pytest.raises(BufferError):
+        trade_manager.record(5, 6, 99.0, 1, "BTC-USD")
+    for view in columns.values():
+        view.release()
+    trade_manager.record(5, 6, 99.0, 1, "BTC-USD")
+    assert len(trade_manager) == 4
+
+
+def test_book_records_into_columns():
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    book = HeapOrderBook("BTC-USD", ColumnarTradeManager(), strategies)
+    book.addOrder("limit", LimitOrder(1, 100, 5, "sell", "BTC-USD"))
+    book.addOrder("limit", LimitOrder(2, 101, 5, "sell", "BTC-USD"))
+    book.addOrder("market", MarketOrder(3, 8, "buy", "BTC-USD"))
+
+    trades = book.trade_manager.trades
+    assert [(t.sell_order_id, t.execution_price, t.filled_quantity) for t in trades] == [
+        (1, 100.0, 5),
+        (2, 101.0, 3),
+    ]
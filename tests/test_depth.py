@@ -0,0 +1,89 @@
+import pytest
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orders import LimitOrder, MarketOrder
+from core.orderbook import HeapOrderBook
+from services.trade_manager import TradeManager
+
+
+@pytest.fixture
+def book():
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    return HeapOrderBook("BTC-USD", TradeManager(), strategies, depth_levels=2)
+
+
+def test_snapshot_follows_adds_fills_and_cancels(book):
+    book.addOrder("limit", LimitOrder(1, 100, 5, "buy", "BTC-USD"))
+    book.addOrder("limit", LimitOrder(2, 100, 3, "buy", "BTC-USD"))
+    book.addOrder("limit", LimitOrder(3, 99, 4, "buy", "BTC-USD"))
+    book.addOrder("limit", LimitOrder(4, 101, 2, "sell", "BTC-USD"))
+
+    snapshot = book.getSnapshot()
+    assert snapshot.bids == ((100, 8, 2), (99, 4, 1))
+    assert snapshot.asks == ((101, 2, 1),)
+
+    book.addOrder("market", MarketOrder(5, 6, "sell", "BTC-USD"))
+    assert book.getSnapshot().bids == ((100, 2, 1), (99, 4, 1))
+
+    book.removeOrder(2)
+    assert book.getSnapshot().bids == ((99, 4, 1),)
+
+    book.addOrder("limit", LimitOrder(6, 99, 10, "sell", "BTC-USD"))
+    snapshot = book.getSnapshot()
+    assert snapshot.bids == ()
+    assert snapshot.asks == ((99, 6, 1), (101, 2, 1))
+
+
+def test_version_only_moves_for_top_levels(book):
+    for order_id, price in ((1, 100), (2, 99), (3, 98)):
+        book.addOrder("limit", LimitOrder(order_id, price, 1, "buy", "BTC-USD"))
+
+    snapshot = book.getSnapshot()
+    assert book.getSnapshot() is snapshot
+
+    # Below the cached depth: readers keep their snapshot
+    book.addOrder("limit", LimitOrder(4, 97, 1, "buy", "BTC-USD"))
+    book.removeOrder(3)
+    assert book.getSnapshot() is snapshot
+
+    book.removeOrder(2)
+    assert book.getSnapshot().version > snapshot.version
+    assert book.getSnapshot().bids == ((100, 1, 1), (97, 1, 1))
+
+
+def test_snapshot_needs_depth_levels():
+    book = HeapOrderBook("BTC-USD", TradeManager(), {})
+    with pytest.raises(ValueError):
+        book.getSnapshot()
+
+
+def test_snapshot_follows_modify(book):
+    book.addOrder("limit", LimitOrder(1, 100, 5, "buy", "BTC-USD"))
+    book.addOrder("limit", LimitOrder(2, 99, 4, "buy", "BTC-USD"))
+
+    book.modifyOrder(1, 2)
+    assert book.getSnapshot().bids == ((100, 2, 1), (99, 4, 1))
+
+    book.modifyOrder(2, 6, 101)
+    assert book.getSnapshot().bids == ((101, 6, 1), (100, 2, 1))
+
+
+def test_estimate_fill_matches_market_order(book):
+    for order_id, price, quantity in ((1, 101, 5), (2, 101, 3), (3, 103, 4), (4, 104, 10)):
+        book.addOrder("limit", LimitOrder(order_id, price, quantity, "sell", "BTC-USD"))
+
+    estimate = book.estimateFill("buy", 12)
+    assert estimate == (12, (8 * 101 + 4 * 103) / 12, 101, 103)
+    assert book.estimateFills("buy", [0, 8, 9, 50]) == [
+        (0, 0, None, None),
+        (8, 101, 101, 101),
+        (9, (8 * 101 + 103) / 9, 101, 103),
+        (22, (8 * 101 + 4 * 103 + 10 * 104) / 22, 101, 104),
+    ]
+    assert book.estimateFill("sell", 5) == (0, 0, None, None)
+    assert len(book.order_map) == 4
+
+    book.addOrder("market", MarketOrder(5, 12, "buy", "BTC-USD"))
+    trades = book.trade_manager.trades
+    assert sum(t.filled_quantity * t.execution_price for t in trades) / 12 == estimate.average_price
+    # The cached totals follow the book once it changes
+    assert book.estimateFill("buy", 12) == (10, 104, 104, 104)
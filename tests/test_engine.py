@@ -0,0 +1,83 @@
+import pytest
+from core.engine import MatchingEngine
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.factory import OrderFactory
+from core.orders import LimitOrder, MarketOrder
+from core.ladder import LadderOrderBook
+from core.market_data import MarketDataFeed
+from services.trade_manager import TradeManager
+
+
+@pytest.fixture
+def engine():
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    OrderFactory.register_order_type("limit", LimitOrder)
+    OrderFactory.register_order_type("market", MarketOrder)
+    return MatchingEngine(TradeManager(), strategies)
+
+
+def test_books_created_lazily_per_asset(engine):
+    assert engine.books == {}
+
+    engine.submitOrder("limit", order_id=1, price=100, quantity=5, order_side="sell", asset="BTC-USD")
+    engine.submitOrder("limit", order_id=2, price=10, quantity=5, order_side="sell", asset="ETH-USD")
+    engine.submitOrder("market", order_id=3, quantity=2, order_side="buy", asset="ETH-USD")
+
+    assert set(engine.books) == {"BTC-USD", "ETH-USD"}
+    assert engine.getBook("BTC-USD").getAsk() == 100
+    assert engine.getBook("ETH-USD").bestOrder("sell").quantity == 3
+
+    trades = engine.trade_manager.trades
+    assert [(t.asset, t.filled_quantity) for t in trades] == [("ETH-USD", 2)]
+
+
+def test_batch_keeps_stream_order_across_books(engine):
+    orders = [
+        ("limit", LimitOrder(1, 100, 5, "sell", "BTC-USD")),
+        ("limit", LimitOrder(2, 10, 5, "sell", "ETH-USD")),
+        ("market", MarketOrder(3, 1, "buy", "BTC-USD")),
+        ("market", MarketOrder(4, 2, "buy", "ETH-USD")),
+        ("market", MarketOrder(5, 3, "buy", "BTC-USD")),
+    ]
+    trades = engine.addOrders(iter(orders))
+
+    assert [t.buy_order_id for t in trades] == [3, 4, 5]
+    assert [t.buy_order_id for t in engine.trade_manager.trades] == [3, 4, 5]
+
+
+def test_asset_options_and_book_class():
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    engine = MatchingEngine(TradeManager(), strategies, book_class=LadderOrderBook)
+    engine.configureAsset("ETH-USD", tick_size=0.01)
+
+    engine.addOrder("limit", LimitOrder(1, 10.05, 5, "buy", "ETH-USD"))
+    engine.removeOrder("ETH-USD", 1)
+
+    book = engine.getBook("ETH-USD")
+    assert isinstance(book, LadderOrderBook)
+    assert book.price_grid.to_ticks(10.05) == 1005
+    assert book.getBid() is None
+    with pytest.raises(ValueError):
+        engine.configureAsset("ETH-USD", tick_size=0.1)
+
+
+def test_book_rejects_other_assets(engine):
+    book = engine.getBook("BTC-USD")
+    with pytest.raises(ValueError):
+        book.addOrder("limit", LimitOrder(1, 100, 5, "buy", "ETH-USD"))
+
+
+def test_market_data_feed_is_per_asset():
+    strategies = {"limit": LimitOrderMatching()}
+    feed = MarketDataFeed()
+    with pytest.raises(ValueError):
+        MatchingEngine(TradeManager(), strategies, market_data=feed)
+
+    engine = MatchingEngine(TradeManager(), strategies)
+    engine.configureAsset("BTC-USD", market_data=feed)
+    with pytest.raises(ValueError):
+        engine.configureAsset("ETH-USD", market_data=feed)
+    engine.configureAsset("ETH-USD", market_data=MarketDataFeed())
+    engine.addOrder("limit", LimitOrder(1, 100, 5, "buy", "BTC-USD"))
+    engine.addOrder("limit", LimitOrder(2, 100, 7, "buy", "ETH-USD"))
+    assert feed.level_quantity["buy"] == {100: 5}
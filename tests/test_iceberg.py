@@ -0,0 +1,154 @@
+import io
+import pytest
+from core.factory import OrderFactory
+from core.ladder import LadderOrderBook
+from core.market_data import MarketDataFeed, BookReplica
+from core.matching import LimitOrderMatching, MarketOrderMatching, IcebergOrderMatching, FOKOrderMatching
+from core.orderbook import HeapOrderBook
+from core.orders import LimitOrder, MarketOrder, IcebergOrder, FOKOrder
+from core.snapshot import save_snapshot
+from services.trade_manager import TradeManager
+
+STRATEGIES = {
+    "limit": LimitOrderMatching(),
+    "market": MarketOrderMatching(),
+    "iceberg": IcebergOrderMatching(),
+    "fok": FOKOrderMatching(),
+}
+
+
+@pytest.fixture(params=[HeapOrderBook, LadderOrderBook])
+def book(request):
+    return request.param("BTC-USD", TradeManager(), STRATEGIES)
+
+
+def fills(book):
+    return [(t.sell_order_id, t.filled_quantity) for t in book.trade_manager.trades]
+
+
+def test_factory_creates_iceberg():
+    OrderFactory.register_order_type("iceberg", IcebergOrder)
+    order = OrderFactory.create_order(
+        "iceberg", order_id=1, price=100, quantity=25, order_side="sell", asset="BTC-USD", display_quantity=10
+    )
+    assert (order.quantity, order.hidden_quantity) == (10, 15)
+
+
+def test_refill_loses_time_priority(book):
+    book.addOrder("iceberg", IcebergOrder(1, 100, 25, "sell", "BTC-USD", display_quantity=10))
+    book.addOrder("limit", LimitOrder(2, 100, 5, "sell", "BTC-USD"))
+
+    book.addOrder("market", MarketOrder(3, 12, "buy", "BTC-USD"))
+    assert fills(book) == [(1, 10), (2, 2)]
+    assert book.bestOrder("sell").order_id == 2
+
+    book.addOrder("market", MarketOrder(4, 20, "buy", "BTC-USD"))
+    assert fills(book)[2:] == [(2, 3), (1, 10), (1, 5)]
+    assert book.bestOrder("sell") is None and not book.order_map
+
+
+def test_sequential_and_sweep_fills_agree(book):
+    stepped = type(book)("BTC-USD", TradeManager(), {**STRATEGIES, "market": MarketOrderMatching(sweep=False)})
+    for target in (book, stepped):
+        target.addOrder("iceberg", IcebergOrder(1, 100, 30, "sell", "BTC-USD", display_quantity=4))
+        target.addOrder("limit", LimitOrder(2, 100, 3, "sell", "BTC-USD"))
+        target.addOrder("limit", LimitOrder(3, 101, 3, "sell", "BTC-USD"))
+        target.addOrder("market", MarketOrder(4, 20, "buy", "BTC-USD"))
+    assert fills(book) == fills(stepped) == [(1, 4), (2, 3), (1, 4), (1, 4), (1, 4), (1, 1)]
+    assert book.bestOrder("sell").quantity == stepped.bestOrder("sell").quantity == 3
+
+
+def test_crossing_iceberg_trades_its_hidden_quantity(book):
+    book.addOrder("limit", LimitOrder(1, 100, 12, "sell", "BTC-USD"))
+    book.addOrder("iceberg", IcebergOrder(2, 100, 20, "buy", "BTC-USD", display_quantity=5))
+    assert fills(book) == [(1, 5), (1, 5), (1, 2)]
+    assert (book.bestOrder("buy").quantity, book.bestOrder("buy").hidden_quantity) == (3, 5)
+
+
+def test_fok_counts_hidden_quantity(book):
+    book.addOrder("iceberg", IcebergOrder(1, 100, 20, "sell", "BTC-USD", display_quantity=5))
+    book.addOrder("fok", FOKOrder(2, 100, 20, "buy", "BTC-USD"))
+    assert sum(quantity for _, quantity in fills(book)) == 20
+
+
+def test_cancel_drops_hidden_quantity(book):
+    book.addOrder("iceberg", IcebergOrder(1, 100, 20, "sell", "BTC-USD", display_quantity=5))
+    book.removeOrder(1)
+    book.addOrder("market", MarketOrder(2, 5, "buy", "BTC-USD"))
+    assert fills(book) == []
+
+
+@pytest.mark.parametrize("sweep", [True, False])
+def test_cancel_behind_iceberg_never_trades(book, sweep):
+    book.strategies = {**STRATEGIES, "market": MarketOrderMatching(sweep=sweep)}
+    book.addOrder("iceberg", IcebergOrder(1, 100, 10, "sell", "BTC-USD", display_quantity=2))
+    book.addOrder("limit", LimitOrder(2, 100, 5, "sell", "BTC-USD"))
+    book.removeOrder(2)
+    book.addOrder("limit", LimitOrder(3, 100, 5, "sell", "BTC-USD"))
+    book.addOrder("market", MarketOrder(4, 3, "buy", "BTC-USD"))
+    assert fills(book) == [(1, 2), (3, 1)]
+    if isinstance(book, HeapOrderBook):
+        assert book.getHeapStats()["sell_dead"] == 0
+
+
+def test_replica_follows_cancel_behind_iceberg():
+    feed = MarketDataFeed()
+    book = HeapOrderBook("BTC-USD", TradeManager(), STRATEGIES, market_data=feed)
+    replica = HeapOrderBook("BTC-USD", TradeManager(), {})
+    feed.subscribe(BookReplica(replica))
+    book.addOrder("iceberg", IcebergOrder(1, 100, 10, "sell", "BTC-USD", display_quantity=2))
+    book.addOrder("limit", LimitOrder(2, 100, 5, "sell", "BTC-USD"))
+    book.removeOrder(2)
+    book.addOrder("limit", LimitOrder(3, 100, 5, "sell", "BTC-USD"))
+    book.addOrder("market", MarketOrder(4, 3, "buy", "BTC-USD"))
+    assert [(o.order_id, o.quantity) for o in replica._firstOrders("sell", 5)] == [(3, 4), (1, 2)]
+
+
+def test_modify_amends_iceberg_total(book):
+    book.addOrder("iceberg", IcebergOrder(1, 100, 100, "sell", "BTC-USD", display_quantity=5))
+    book.addOrder("limit", LimitOrder(2, 100, 5, "sell", "BTC-USD"))
+
+    order = book.modifyOrder(1, 50)
+    assert (order.quantity, order.hidden_quantity) == (5, 45)
+    assert book.bestOrder("sell") is order
+    order = book.modifyOrder(1, 3)
+    assert (order.quantity, order.hidden_quantity) == (3, 0)
+
+    order = book.modifyOrder(1, 12)
+    assert (order.quantity, order.hidden_quantity) == (5, 7)
+    assert book.bestOrder("sell").order_id == 2
+    book.addOrder("market", MarketOrder(3, 20, "buy", "BTC-USD"))
+    assert fills(book) == [(2, 5), (1, 5), (1, 5), (1, 2)]
+
+
+def test_replica_and_snapshot():
+    feed = MarketDataFeed()
+    book = HeapOrderBook("BTC-USD", TradeManager(), STRATEGIES, market_data=feed, depth_levels=2)
+    replica = HeapOrderBook("BTC-USD", TradeManager(), {})
+    feed.subscribe(BookReplica(replica))
+    book.addOrder("iceberg", IcebergOrder(1, 100, 20, "sell", "BTC-USD", display_quantity=5))
+    book.addOrder("limit", LimitOrder(2, 100, 5, "sell", "BTC-USD"))
+    book.addOrder("market", MarketOrder(3, 7, "buy", "BTC-USD"))
+
+    assert [(o.order_id, o.quantity) for o in replica._firstOrders("sell", 5)] == [(2, 3), (1, 5)]
+    assert book.getSnapshot().asks == ((100, 8, 2),)
+    with pytest.raises(ValueError):
+        save_snapshot(book, io.BytesIO())
+
+
+@pytest.mark.parametrize("book_class", [HeapOrderBook, LadderOrderBook])
+def test_estimate_fill_counts_hidden_quantity(book_class):
+    options = {"depth_levels": 2} if book_class is HeapOrderBook else {}
+    book = book_class("BTC-USD", TradeManager(), STRATEGIES, **options)
+    book.addOrder("iceberg", IcebergOrder(1, 100, 50, "sell", "BTC-USD", display_quantity=5))
+    book.addOrder("limit", LimitOrder(2, 105, 50, "sell", "BTC-USD"))
+
+    assert book.estimateFill("buy", 20) == (20, 100, 100, 100)
+    book.modifyOrder(1, 30)
+    book.addOrder("market", MarketOrder(3, 7, "buy", "BTC-USD"))
+    # 23 left at 100, 3 of them showing
+    assert book.estimateFill("buy", 25) == (25, pytest.approx((23 * 100 + 2 * 105) / 25), 100, 105)
+    if book_class is HeapOrderBook:
+        assert book.getSnapshot().asks == ((100, 3, 1), (105, 50, 1))
+    book.removeOrder(1)
+    assert book.estimateFill("buy", 20) == (20, 105, 105, 105)
@@ -0,0 +1,152 @@
+import pytest
+import random
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.factory import OrderFactory
+from core.orders import LimitOrder, MarketOrder
+from services.trade_manager import TradeManager
+from core.orderbook import HeapOrderBook
+from core.ladder import LadderOrderBook
+
+
+def make_book(book_class):
+    strategies = {
+        "limit": LimitOrderMatching(),
+        "market": MarketOrderMatching(),
+    }
+    OrderFactory.register_order_type("limit", LimitOrder)
+    OrderFactory.register_order_type("market", MarketOrder)
+    return book_class("BTC-USD", TradeManager(), strategies)
+
+
+@pytest.fixture
+def ladder_book():
+    return make_book(LadderOrderBook)
+
+
+def limit(order_id, price, quantity, side):
+    return OrderFactory.create_order(
+        "limit", order_id=order_id, price=price, quantity=quantity, order_side=side, asset="BTC-USD"
+    )
+
+
+def test_levels_aggregate_quantity(ladder_book):
+    ladder_book.addOrder("limit", limit(1, 100, 10, "buy"))
+    ladder_book.addOrder("limit", limit(2, 100, 5, "buy"))
+    ladder_book.addOrder("limit", limit(3, 99, 7, "buy"))
+    ladder_book.addOrder("limit", limit(4, 105, 3, "sell"))
+
+    assert ladder_book.getBid() == 100
+    assert ladder_book.getAsk() == 105
+    assert ladder_book.getBidOrder().order_id == 1
+    assert ladder_book.getDepth("buy", 5) == [(100, 15, 2), (99, 7, 1)]
+    assert ladder_book.getDepth("sell", 1) == [(105, 3, 1)]
+
+
+def test_cancel_updates_level_and_priority(ladder_book):
+    ladder_book.addOrder("limit", limit(1, 100, 10, "buy"))
+    ladder_book.addOrder("limit", limit(2, 100, 5, "buy"))
+    ladder_book.addOrder("limit", limit(3, 99, 7, "buy"))
+
+    ladder_book.removeOrder(1)
+    assert ladder_book.getBidOrder().order_id == 2
+    assert ladder_book.getDepth("buy", 5) == [(100, 5, 1), (99, 7, 1)]
+
+    ladder_book.removeOrder(2)
+    assert ladder_book.getBid() == 99
+    assert 2 not in ladder_book.order_map
+
+
+def test_same_trades_as_heap_book():
+    flow = [
+        ("limit", 1, 100, 10, "buy"),
+        ("limit", 2, 101, 4, "buy"),
+        ("limit", 3, 102, 6, "sell"),
+        ("limit", 4, 100, 8, "sell"),
+        ("market", 5, None, 9, "buy"),
+        ("limit", 6, 98, 5, "buy"),
+        ("market", 7, None, 12, "sell"),
+    ]
+    trades = []
+    for book_class in (HeapOrderBook, LadderOrderBook):
+        book = make_book(book_class)
+        for order_type, order_id, price, quantity, side in flow:
+            if order_type == "limit":
+                order = limit(order_id, price, quantity, side)
+            else:
+                order = MarketOrder(order_id, quantity, side, "BTC-USD")
+            book.addOrder(order_type, order)
+        trades.append(
+            [
+                (t.buy_order_id, t.sell_order_id, t.execution_price, t.filled_quantity)
+                for t in book.trade_manager.trades
+            ]
+        )
+
+    assert trades[0] == trades[1]
+    assert len(trades[0]) == 5
+
+
+def test_market_order_sweeps_levels(ladder_book):
+    ladder_book.addOrder("limit", limit(1, 101, 5, "sell"))
+    ladder_book.addOrder("limit", limit(2, 102, 5, "sell"))
+    ladder_book.addOrder("limit", limit(3, 103, 5, "sell"))
+
+    market_order = MarketOrder(4, 12, "buy", "BTC-USD")
+    avg_price = ladder_book.strategies["market"].match(ladder_book, market_order)
+
+    assert avg_price == pytest.approx((5 * 101 + 5 * 102 + 2 * 103) / 12)
+    assert ladder_book.getDepth("sell", 5) == [(103, 3, 1)]
+
+
+def test_modify_order_matches_heap_book(ladder_book):
+    heap_book = HeapOrderBook("BTC-USD", TradeManager(), ladder_book.strategies)
+    for book in (heap_book, ladder_book):
+        book.addOrder("limit", LimitOrder(1, 100, 10, "buy", "BTC-USD"))
+        book.addOrder("limit", LimitOrder(2, 100, 10, "buy", "BTC-USD"))
+        book.addOrder("limit", LimitOrder(3, 99, 10, "buy", "BTC-USD"))
+        book.modifyOrder(1, 4)
+        book.modifyOrder(2, 15)
+        book.modifyOrder(3, 10, 101)
+        book.addOrder("market", MarketOrder(4, 20, "sell", "BTC-USD"))
+
+    def as_tuples(book):
+        return [(t.buy_order_id, t.execution_price, t.filled_quantity) for t in book.trade_manager.trades]
+
+    assert as_tuples(ladder_book) == as_tuples(heap_book) == [(3, 101, 10), (1, 100, 4), (2, 100, 6)]
+    assert ladder_book.getDepth("buy", 1) == [(100, 9, 1)]
+
+
+@pytest.mark.parametrize("book_class", [HeapOrderBook, LadderOrderBook])
+def test_requeuing_modify_needs_a_limit_strategy(book_class):
+    book = book_class("BTC-USD", TradeManager(), {})
+    book.restOrder(LimitOrder(1, 100, 5, "sell", "BTC-USD"))
+    book.restOrder(LimitOrder(2, 99, 5, "buy", "BTC-USD"))
+    with pytest.raises(ValueError):
+        book.modifyOrder(2, 5, 100)
+    # Reducing in place needs no matching
+    assert book.modifyOrder(2, 3).quantity == 3
+    assert book.bestOrder("buy").price == 99
+
+
+def test_modify_order_rejects_negative_quantity(ladder_book):
+    ladder_book.addOrder("limit", LimitOrder(1, 100, 10, "buy", "BTC-USD"))
+    with pytest.raises(ValueError):
+        ladder_book.modifyOrder(1, -5)
+    assert ladder_book.getDepth("buy", 1) == [(100, 10, 1)]
+
+
+def test_estimate_fill_matches_heap_book(ladder_book):
+    heap_book = HeapOrderBook("BTC-USD", TradeManager(), ladder_book.strategies, depth_levels=1)
+    rng = random.Random(3)
+    for book in (heap_book, ladder_book):
+        rng.seed(3)
+        for order_id in range(1, 200):
+            side = rng.choice(("buy", "sell"))
+            price = rng.randint(90, 99) if side == "buy" else rng.randint(101, 110)
+            book.addOrder("limit", LimitOrder(order_id, price, rng.randint(1, 10), side, "BTC-USD"))
+        book.removeOrder(7)
+        book.modifyOrder(8, 1)
+
+    quantities = list(range(0, 1200, 37))
+    for side in ("buy", "sell"):
+        assert ladder_book.estimateFills(side, quantities) == heap_book.estimateFills(side, quantities)
@@ -0,0 +1,145 @@
+import logging
+import os
+import subprocess
+import sys
+import pytest
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orders import LimitOrder, MarketOrder
+from core.trades import Trade
+from services.trade_manager import TradeManager
+from core.orderbook import HeapOrderBook
+from utils.logger import logger, configure_logging, disable_queue_logging, set_log_mode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def capture():
+    handler = ListHandler()
+    root = logging.getLogger()
+    root.addHandler(handler)
+    yield handler
+    disable_queue_logging()
+    logger.setLevel(logging.INFO)
+    root.removeHandler(handler)
+
+
+def test_queue_mode_writes_through_listener(capture):
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    book = HeapOrderBook("BTC-USD", TradeManager(), strategies, log_mode="queue")
+    assert capture not in logging.getLogger().handlers
+
+    order = LimitOrder(1, 100, 10, "buy", "BTC-USD")
+    book.addOrder("limit", order)
+    # Message arguments are resolved when logged, not when the listener gets to them
+    order.quantity = 3
+
+    disable_queue_logging()
+    assert capture in logging.getLogger().handlers
+    assert any("qty=10" in message for message in capture.messages)
+
+
+def test_sync_book_leaves_queue_logging_on(capture):
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    HeapOrderBook("BTC-USD", TradeManager(), strategies, log_mode="queue")
+    HeapOrderBook("ETH-USD", TradeManager(), strategies, log_mode="sync")
+    assert capture not in logging.getLogger().handlers
+
+    set_log_mode("sync")
+    assert capture in logging.getLogger().handlers
+
+
+class ExplodingRepr:
+    __slots__ = ()
+
+    def __repr__(self):
+        raise AssertionError("formatted while INFO is off")
+
+
+class ExplodingLimitOrder(ExplodingRepr, LimitOrder):
+    __slots__ = ()
+
+
+class ExplodingMarketOrder(ExplodingRepr, MarketOrder):
+    __slots__ = ()
+
+
+class ExplodingTrade(ExplodingRepr, Trade):
+    __slots__ = ()
+
+
+@pytest.mark.parametrize("sweep", [True, False])
+def test_disabled_level_skips_formatting(capture, sweep):
+    # sweep=True records trades through record_trades, sweep=False one by one through record_trade
+    strategies = {
+        "limit": LimitOrderMatching(ExplodingTrade),
+        "market": MarketOrderMatching(ExplodingTrade, sweep=sweep),
+    }
+    book = HeapOrderBook("BTC-USD", TradeManager(), strategies)
+    logger.setLevel(logging.WARNING)
+    book.addOrder("limit", ExplodingLimitOrder(1, 100, 10, "sell", "BTC-USD"))
+    book.addOrder("limit", ExplodingLimitOrder(2, 100, 2, "buy", "BTC-USD"))
+    book.addOrder("market", ExplodingMarketOrder(3, 5, "buy", "BTC-USD"))
+
+    assert len(book.trade_manager.trades) == 2
+    assert capture.messages == []
+
+
+def test_unknown_log_mode():
+    with pytest.raises(ValueError):
+        set_log_mode("async")
+
+
+def test_import_has_no_io_side_effects(tmp_path):
+    code = "import core.orderbook, core.matching, services.trade_manager"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_first_log_creates_default_file(tmp_path):
+    code = "from utils.logger import logger; logger.info('first record')"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True)
+
+    log_files = list((tmp_path / "logs").iterdir())
+    assert len(log_files) == 1
+    assert "first record" in log_files[0].read_text()
+
+
+def test_queue_mode_before_any_setup_still_writes(tmp_path):
+    code = (
+        "from core.orderbook import HeapOrderBook; from utils.logger import logger; "
+        "HeapOrderBook('BTC-USD', None, {}, log_mode='queue'); logger.warning('queued record')"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True, capture_output=True, text=True)
+
+    assert "queued record" in result.stderr
+    log_files = list((tmp_path / "logs").iterdir())
+    assert len(log_files) == 1
+    assert "queued record" in log_files[0].read_text()
+
+
+def test_configure_rotating_shared_file(tmp_path):
+    root = logging.getLogger()
+    log_file = tmp_path / "shared.log"
+    configure_logging(log_file=str(log_file), stream=False, max_bytes=200, backup_count=2)
+    try:
+        for index in range(20):
+            logger.info("record %s", index)
+    finally:
+        configure_logging(log_file=None, stream=False)
+        root.setLevel(logging.WARNING)
+
+    assert log_file.exists()
+    assert (tmp_path / "shared.log.1").exists()
@@ -0,0 +1,65 @@
+import random
+from core.market_data import MarketDataFeed, BookReplica, ADD, REDUCE, CANCEL, TRADE, LEVEL
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orders import LimitOrder, MarketOrder
+from core.orderbook import HeapOrderBook
+from services.trade_manager import TradeManager
+
+
+def make_book(feed=None):
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    return HeapOrderBook("BTC-USD", TradeManager(), strategies, market_data=feed)
+
+
+def test_events_for_add_fill_and_cancel():
+    feed = MarketDataFeed()
+    events = []
+    feed.subscribe(events.append)
+    book = make_book(feed)
+
+    book.addOrder("limit", LimitOrder(1, 100, 5, "sell", "BTC-USD"))
+    book.addOrder("limit", LimitOrder(2, 100, 5, "sell", "BTC-USD"))
+    book.addOrder("market", MarketOrder(3, 7, "buy", "BTC-USD"))
+    book.removeOrder(2)
+
+    assert [event.seq for event in events] == list(range(1, len(events) + 1))
+    assert [(e.event, e.order_id, e.quantity) for e in events] == [
+        (ADD, 1, 5), (LEVEL, None, 5),
+        (ADD, 2, 5), (LEVEL, None, 10),
+        (TRADE, 3, 5), (REDUCE, 1, 0), (LEVEL, None, 5),
+        (TRADE, 3, 2), (REDUCE, 2, 3), (LEVEL, None, 3),
+        (CANCEL, 2, 3), (LEVEL, None, 0),
+    ]
+    assert events[4].contra_order_id == 1
+
+
+def test_replica_rebuilds_identical_book():
+    feed = MarketDataFeed()
+    book = make_book(feed)
+    replica = make_book()
+    feed.subscribe(BookReplica(replica))
+
+    rng = random.Random(5)
+    for order_id in range(1, 400):
+        side = rng.choice(("buy", "sell"))
+        roll = rng.random()
+        if roll < 0.15:
+            book.addOrder("market", MarketOrder(order_id, rng.randint(1, 30), side, "BTC-USD"))
+        elif roll < 0.35 and book.order_map:
+            book.removeOrder(rng.choice(list(book.order_map)))
+        elif roll < 0.5 and book.order_map:
+            order = book.order_map[rng.choice(list(book.order_map))]
+            new_price = order.price if rng.random() < 0.5 else rng.randint(95, 105)
+            book.modifyOrder(order.order_id, rng.randint(0, order.quantity + 2), new_price)
+        else:
+            book.addOrder("limit", LimitOrder(order_id, rng.randint(95, 105), rng.randint(1, 10), side, "BTC-USD"))
+
+    for side in ("buy", "sell"):
+        original = [(o.order_id, o.price, o.quantity) for o in book._firstOrders(side, 1000)]
+        rebuilt = [(o.order_id, o.price, o.quantity) for o in replica._firstOrders(side, 1000)]
+        assert original == rebuilt
+
+    def as_tuples(trades):
+        return [(t.buy_order_id, t.sell_order_id, t.execution_price, t.filled_quantity) for t in trades]
+
+    assert as_tuples(replica.trade_manager.trades) == as_tuples(book.trade_manager.trades)
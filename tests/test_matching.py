@@ -0,0 +1,69 @@
+import random
+import pytest
+from core.ladder import LadderOrderBook
+from core.market_data import MarketDataFeed
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orders import LimitOrder, MarketOrder
+from core.orderbook import HeapOrderBook
+from services.trade_manager import TradeManager
+
+
+def run_flow(book_class, sweep, **book_options):
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching(sweep=sweep)}
+    book = book_class("BTC-USD", TradeManager(), strategies, **book_options)
+    rng = random.Random(9)
+    for order_id in range(1, 600):
+        side = rng.choice(("buy", "sell"))
+        roll = rng.random()
+        if roll < 0.15:
+            # Big enough to take out several levels, sometimes the whole side
+            book.addOrder("market", MarketOrder(order_id, rng.randint(1, 120), side, "BTC-USD"))
+        elif roll < 0.35 and book.order_map:
+            book.removeOrder(rng.choice(sorted(book.order_map)))
+        else:
+            price = rng.randint(90, 99) if side == "buy" else rng.randint(101, 110)
+            book.addOrder("limit", LimitOrder(order_id, price, rng.randint(1, 10), side, "BTC-USD"))
+    return book
+
+
+def book_state(book):
+    trades = [(t.buy_order_id, t.sell_order_id, t.execution_price, t.filled_quantity) for t in book.trade_manager.trades]
+    resting = {
+        side: [(o.order_id, o.price, o.quantity) for o in book._firstOrders(side, 10_000)] for side in ("buy", "sell")
+    }
+    return trades, resting, sorted(book.order_map)
+
+
+@pytest.mark.parametrize("book_class", [HeapOrderBook, LadderOrderBook])
+def test_sweep_matches_sequential_fills(book_class):
+    swept = run_flow(book_class, sweep=True)
+    stepped = run_flow(book_class, sweep=False)
+    assert book_state(swept) == book_state(stepped)
+    assert len(swept.trade_manager.trades) > 100
+
+
+def test_sweep_publishes_same_market_data_and_depth():
+    streams = []
+    books = []
+    for sweep in (True, False):
+        feed = MarketDataFeed()
+        events = []
+        feed.subscribe(events.append)
+        streams.append(events)
+        books.append(run_flow(HeapOrderBook, sweep, market_data=feed, depth_levels=5))
+    assert streams[0] == streams[1]
+    assert books[0].getSnapshot() == books[1].getSnapshot()
+    assert books[0].getHeapStats() == books[1].getHeapStats()
+
+
+def test_sweep_partially_fills_last_order():
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    for book_class in (HeapOrderBook, LadderOrderBook):
+        book = book_class("BTC-USD", TradeManager(), strategies)
+        for order_id, price in ((1, 101), (2, 101), (3, 102)):
+            book.addOrder("limit", LimitOrder(order_id, price, 5, "sell", "BTC-USD"))
+        book.removeOrder(2)
+
+        trades = book.addOrders([("market", MarketOrder(4, 8, "buy", "BTC-USD"))])
+        assert [(t.sell_order_id, t.execution_price, t.filled_quantity) for t in trades] == [(1, 101, 5), (3, 102, 3)]
+        assert book.bestOrder("sell").quantity == 2
@@ -0,0 +1,49 @@
+import pytest
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orders import LimitOrder, MarketOrder
+from core.orderbook import HeapOrderBook
+from services.trade_manager import TradeManager
+from utils.metrics import BookMetrics
+
+
+@pytest.fixture
+def book():
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    return HeapOrderBook("BTC-USD", TradeManager(), strategies, metrics=BookMetrics())
+
+
+def test_metrics_count_orders_trades_and_cancels(book):
+    book.addOrder("limit", LimitOrder(1, 100, 5, "sell", "BTC-USD"))
+    book.addOrder("limit", LimitOrder(2, 101, 5, "sell", "BTC-USD"))
+    book.addOrder("limit", LimitOrder(3, 102, 5, "sell", "BTC-USD"))
+    book.addOrders([("market", MarketOrder(4, 7, "buy", "BTC-USD"))])
+    book.removeOrder(3)
+    book.removeOrder(3)
+
+    stats = book.getMetrics()
+    assert stats["orders"] == 4
+    assert stats["trades"] == 2
+    assert stats["cancels"] == 1
+    assert stats["cancel_misses"] == 1
+    assert stats["trades_per_order"]["max"] == 2
+    assert stats["sell_depth"] == 1
+    assert stats["timers_ns"]["match"]["count"] == 4
+    assert stats["timers_ns"]["order"]["min"] > 0
+
+
+def test_tombstones_and_text_dump(book):
+    for order_id in range(1, 5):
+        book.addOrder("limit", LimitOrder(order_id, 100 - order_id, 1, "buy", "BTC-USD"))
+    book.removeOrder(3)
+
+    assert book.getMetrics()["tombstones"] == 1
+    dump = book.dumpMetrics()
+    assert dump.splitlines()[0].split()[:2] == ["timer", "count"]
+    assert "tombstones: 1" in dump
+
+
+def test_metrics_off_by_default():
+    book = HeapOrderBook("BTC-USD", TradeManager(), {"limit": LimitOrderMatching()})
+    book.addOrder("limit", LimitOrder(1, 100, 1, "buy", "BTC-USD"))
+    with pytest.raises(ValueError):
+        book.getMetrics()
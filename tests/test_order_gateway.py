@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import pytest
+from core.engine import MatchingEngine
+from core.factory import OrderFactory
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orders import LimitOrder, MarketOrder
+from services.order_gateway import OrderGateway, OrderGatewayClient
+from services.trade_manager import TradeManager
+from utils.logger import logger
+
+
+@pytest.fixture
+def engine():
+    OrderFactory.register_order_type("limit", LimitOrder)
+    OrderFactory.register_order_type("market", MarketOrder)
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    logger.setLevel(logging.ERROR)
+    yield MatchingEngine(TradeManager(), strategies)
+    logger.setLevel(logging.INFO)
+
+
+def limit(order_id, price, quantity, side):
+    return {"type": "limit", "order_id": order_id, "price": price, "quantity": quantity, "order_side": side, "asset": "BTC-USD"}
+
+
+def test_acks_and_trade_reports(engine):
+    async def scenario():
+        gateway = OrderGateway(engine)
+        await gateway.start()
+        client = await OrderGatewayClient.connect(port=gateway.address[1])
+
+        await client.send(limit(1, 100, 5, "sell"))
+        assert await client.receive() == {"event": "ack", "order_id": 1, "status": "accepted"}
+
+        await client.send({"type": "market", "order_id": 2, "quantity": 3, "order_side": "buy", "asset": "BTC-USD"})
+        assert (await client.receive())["event"] == "ack"
+        assert await client.receive() == {
+            "event": "trade", "buy_order_id": 2, "sell_order_id": 1, "price": 100, "quantity": 3, "asset": "BTC-USD",
+        }
+
+        await client.send({"type": "cancel", "order_id": 1, "asset": "BTC-USD"})
+        assert await client.receive() == {"event": "ack", "order_id": 1, "status": "cancelled"}
+
+        await client.send({"type": "stop", "order_id": 3})
+        assert (await client.receive())["event"] == "reject"
+
+        await client.close()
+        await gateway.close()
+
+    asyncio.run(scenario())
+    assert engine.getBook("BTC-USD").bestOrder("sell") is None
+
+
+def test_burst_through_small_queue_over_unix_socket(engine, tmp_path):
+    path = str(tmp_path / "gateway.sock")
+
+    async def scenario():
+        gateway = OrderGateway(engine, queue_size=2)
+        await gateway.start(path=path)
+        client = await OrderGatewayClient.connect(path=path)
+
+        for order_id in range(1, 201):
+            await client.send(limit(order_id, 100 + order_id % 3, 1, "buy"))
+        acks = [await client.receive() for _ in range(200)]
+
+        await client.close()
+        await gateway.close()
+        return acks
+
+    acks = asyncio.run(scenario())
+    assert [ack["order_id"] for ack in acks] == list(range(1, 201))
+    assert len(engine.getBook("BTC-USD").order_map) == 200
+
+
+def test_trades_reach_both_sides_and_errors_keep_the_book_running(engine):
+    async def scenario():
+        gateway = OrderGateway(engine)
+        await gateway.start()
+        maker = await OrderGatewayClient.connect(port=gateway.address[1])
+        taker = await OrderGatewayClient.connect(port=gateway.address[1])
+
+        await maker.send(limit(1, 100, 5, "sell"))
+        assert (await maker.receive())["event"] == "ack"
+
+        # A bad price type only rejects that order
+        await taker.send(limit(2, "100", 5, "buy"))
+        assert (await taker.receive())["event"] == "reject"
+
+        # Sweeps the ask, then has no bid to convert at: rejected, but the fill is reported
+        await taker.send({
+            "type": "market", "order_id": 3, "quantity": 8, "order_side": "buy", "asset": "BTC-USD",
+            "partial_fill_behavior": "convert_to_limit",
+        })
+        assert (await taker.receive())["event"] == "reject"
+        trade = {"event": "trade", "buy_order_id": 3, "sell_order_id": 1, "price": 100, "quantity": 5, "asset": "BTC-USD"}
+        assert await taker.receive() == trade
+        assert await maker.receive() == trade
+
+        await taker.send(limit(4, 99, 1, "buy"))
+        assert await taker.receive() == {"event": "ack", "order_id": 4, "status": "accepted"}
+
+        await maker.close()
+        await taker.close()
+        await gateway.close()
+
+    asyncio.run(scenario())
+
+
+def test_invalid_and_duplicate_orders_are_rejected(engine):
+    async def scenario():
+        gateway = OrderGateway(engine)
+        await gateway.start()
+        client = await OrderGatewayClient.connect(port=gateway.address[1])
+        other = await OrderGatewayClient.connect(port=gateway.address[1])
+
+        await client.send(limit(1, 100, -5, "buy"))
+        assert (await client.receive())["event"] == "reject"
+        await client.send(limit(2, 100, 5, "bye"))
+        assert (await client.receive())["event"] == "reject"
+
+        await client.send(limit(3, 100, 5, "sell"))
+        assert (await client.receive())["event"] == "ack"
+        # Reusing a live ID can't take over the first order's fill reports
+        await other.send(limit(3, 101, 5, "sell"))
+        assert await other.receive() == {"event": "reject", "order_id": 3, "reason": "Order ID is already live"}
+
+        await other.send({"type": "cancel", "order_id": 2, "asset": "BTC-USD"})
+        assert (await other.receive())["event"] == "ack"
+        await other.send({"type": "market", "order_id": 4, "quantity": 5, "order_side": "buy", "asset": "BTC-USD"})
+        assert (await other.receive())["event"] == "ack"
+        assert (await client.receive())["sell_order_id"] == 3
+
+        await client.close()
+        await other.close()
+        await gateway.close()
+
+    asyncio.run(scenario())
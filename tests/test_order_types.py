@@ -0,0 +1,103 @@
+import pytest
+from core.factory import OrderFactory
+from core.ladder import LadderOrderBook
+from core.matching import (
+    LimitOrderMatching,
+    MarketOrderMatching,
+    IOCOrderMatching,
+    FOKOrderMatching,
+    PostOnlyOrderMatching,
+    StopOrderMatching,
+)
+from core.orderbook import HeapOrderBook
+from core.orders import LimitOrder, MarketOrder, IOCOrder, FOKOrder, PostOnlyOrder, StopOrder, StopLimitOrder
+from services.trade_manager import TradeManager
+
+
+@pytest.fixture(params=[HeapOrderBook, LadderOrderBook])
+def book(request):
+    strategies = {
+        "limit": LimitOrderMatching(),
+        "market": MarketOrderMatching(),
+        "ioc": IOCOrderMatching(),
+        "fok": FOKOrderMatching(),
+        "post_only": PostOnlyOrderMatching(),
+        "stop": StopOrderMatching(),
+        "stop_limit": StopOrderMatching(),
+    }
+    book = request.param("BTC-USD", TradeManager(), strategies)
+    for order_id, price, quantity in ((1, 101, 5), (2, 102, 5), (3, 104, 5)):
+        book.addOrder("limit", LimitOrder(order_id, price, quantity, "sell", "BTC-USD"))
+    book.addOrder("limit", LimitOrder(4, 99, 5, "buy", "BTC-USD"))
+    return book
+
+
+def trades(book):
+    return [(t.buy_order_id, t.sell_order_id, t.execution_price, t.filled_quantity) for t in book.trade_manager.trades]
+
+
+def test_factory_creates_extended_types():
+    OrderFactory.register_order_type("stop_limit", StopLimitOrder)
+    order = OrderFactory.create_order(
+        "stop_limit", order_id=1, stop_price=105, price=106, quantity=2, order_side="buy", asset="BTC-USD"
+    )
+    assert isinstance(order, StopLimitOrder) and order.trigger()[0] == "limit"
+
+
+def test_ioc_fills_up_to_its_price_and_drops_the_rest(book):
+    book.addOrder("ioc", IOCOrder(10, 102, 12, "buy", "BTC-USD"))
+    assert trades(book) == [(10, 1, 101, 5), (10, 2, 102, 5)]
+    assert 10 not in book.order_map
+    assert book.bestOrder("sell").order_id == 3
+
+
+def test_fok_is_killed_without_touching_the_book(book):
+    book.addOrder("fok", FOKOrder(10, 102, 11, "buy", "BTC-USD"))
+    assert trades(book) == []
+    assert book.fillableQuantity("sell", 102, 100) == 10
+
+    book.addOrder("fok", FOKOrder(11, 104, 11, "buy", "BTC-USD"))
+    assert trades(book) == [(11, 1, 101, 5), (11, 2, 102, 5), (11, 3, 104, 1)]
+
+
+def test_fillable_quantity_skips_cancelled_orders(book):
+    book.removeOrder(2)
+    assert book.fillableQuantity("sell", 103, 100) == 5
+    assert book.fillableQuantity("sell", 104, 7) == 7
+    assert book.fillableQuantity("buy", 100, 10) == 0
+
+
+def test_post_only_rests_or_is_rejected(book):
+    book.addOrder("post_only", PostOnlyOrder(10, 101, 3, "buy", "BTC-USD"))
+    assert trades(book) == [] and 10 not in book.order_map
+
+    book.addOrder("post_only", PostOnlyOrder(11, 100, 3, "buy", "BTC-USD"))
+    assert book.bestOrder("buy").order_id == 11
+    assert isinstance(book.order_map[11], LimitOrder)
+
+
+def test_stop_fires_once_its_price_trades(book):
+    book.addOrder("stop", StopOrder(10, 102, 4, "buy", "BTC-USD"))
+    book.addOrder("stop_limit", StopLimitOrder(11, 99, 98, 2, "sell", "BTC-USD"))
+    book.addOrder("stop", StopOrder(12, 103, 1, "buy", "BTC-USD"))
+    book.removeOrder(12)
+    assert trades(book) == []
+
+    # Trades at 101 fire nothing, trading through to 102 releases the buy stop
+    book.addOrder("market", MarketOrder(20, 5, "buy", "BTC-USD"))
+    assert book.stops.orders.keys() == {10, 11}
+    book.addOrder("market", MarketOrder(21, 1, "buy", "BTC-USD"))
+    assert trades(book)[-2:] == [(21, 2, 102, 1), (10, 2, 102, 4)]
+    assert book.stops.orders.keys() == {11}
+
+    # Once 99 trades the sell stop_limit is released as a limit at 98 and crosses the bid
+    book.addOrder("market", MarketOrder(22, 1, "sell", "BTC-USD"))
+    assert trades(book)[-2:] == [(4, 22, 99, 1), (4, 11, 98, 2)]
+    assert book.bestOrder("buy").quantity == 2
+    assert not book.stops.orders
+
+
+def test_stop_through_the_last_price_fires_at_once(book):
+    book.addOrder("market", MarketOrder(20, 5, "buy", "BTC-USD"))
+    book.addOrder("stop", StopOrder(10, 100, 2, "buy", "BTC-USD"))
+    assert trades(book)[-1] == (10, 2, 102, 2)
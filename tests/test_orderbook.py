@@ -114,4 +114,133 @@ def test_market_order_converts_to_limit_on_no_liquidity(empty_orderbook):
 
     assert len(orderbook.buy_orders) == 0
     pending_order = orderbook.sell_orders[0]
-    assert pending_order.quantity == 5
\ No newline at end of file
+    assert pending_order.quantity == 5
+
+
+def test_remove_order_tracks_dead_entries(order_book):
+    for order_id in range(1, 5):
+        order_book.addOrder(
+            "limit",
+            LimitOrder(order_id=order_id, price=100 - order_id, quantity=10, order_side="buy", asset="BTC-USD"),
+        )
+
+    order_book.compaction_ratio = None
+    order_book.removeOrder(3)
+
+    stats = order_book.getHeapStats()
+    assert stats["live_orders"] == 3
+    assert stats["dead_orders"] == 1
+    assert stats["buy_entries"] == 4
+
+    # Cancelling the best bid pops it straight off the top
+    order_book.removeOrder(1)
+    assert order_book.getBidOrder().order_id == 2
+    assert order_book.getHeapStats()["dead_orders"] == 1
+
+
+def test_cancel_heavy_flow_compacts_heap(order_book):
+    for order_id in range(1, 101):
+        order_book.addOrder(
+            "limit",
+            LimitOrder(order_id=order_id, price=100 + order_id, quantity=1, order_side="sell", asset="BTC-USD"),
+        )
+
+    # Cancel everything behind the best ask, the top never turns into a tombstone
+    for order_id in range(2, 101):
+        order_book.removeOrder(order_id)
+        stats = order_book.getHeapStats()
+        assert stats["sell_dead"] <= order_book.compaction_ratio * stats["sell_entries"]
+
+    assert order_book.getHeapStats()["compactions"] > 0
+    assert len(order_book.sell_orders) < 10
+    assert order_book.getAsk() == 101
+
+
+def test_add_orders_matches_sequential_add_order():
+    def flow():
+        for order_id in range(1, 41):
+            side = "buy" if order_id % 2 else "sell"
+            if order_id % 7 == 0:
+                yield "market", MarketOrder(order_id, 15, side, "BTC-USD")
+            else:
+                yield "limit", LimitOrder(order_id, 100 + (order_id * 3) % 11, 10, side, "BTC-USD")
+
+    def as_tuples(trades):
+        return [
+            (t.buy_order_id, t.sell_order_id, t.execution_price, t.filled_quantity)
+            for t in trades
+        ]
+
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    sequential = HeapOrderBook("BTC-USD", TradeManager(), strategies)
+    for order_type, order in flow():
+        sequential.addOrder(order_type, order)
+
+    batched = HeapOrderBook("BTC-USD", TradeManager(), strategies)
+    trades = batched.addOrders(flow())
+
+    assert trades
+    assert as_tuples(trades) == as_tuples(sequential.trade_manager.trades)
+    assert as_tuples(batched.trade_manager.trades) == as_tuples(trades)
+    assert batched.getBid() == sequential.getBid()
+    assert batched.getAsk() == sequential.getAsk()
+
+
+def test_time_priority_follows_arrival_in_book(order_book):
+    first = LimitOrder(1, 100, 10, "sell", "BTC-USD")
+    second = LimitOrder(2, 100, 10, "sell", "BTC-USD")
+    # Same timestamp string, book arrival decides the priority
+    second.timestamp = first.timestamp = "2025-01-01 00:00:00.000000"
+
+    order_book.addOrder("limit", second)
+    order_book.addOrder("limit", first)
+
+    assert order_book.getAskOrder().order_id == 2
+
+
+def test_list_shows_best_orders_first_in_priority(order_book):
+    for order_id, price in ((1, 98), (2, 101), (3, 99), (4, 101)):
+        order_book.addOrder("limit", LimitOrder(order_id, price, 10, "buy", "BTC-USD"))
+    order_book.removeOrder(3)
+
+    assert [order.order_id for order in order_book._firstOrders("buy", 3)] == [2, 4, 1]
+
+
+def test_modify_order_reduces_in_place_keeping_priority(order_book):
+    order_book.addOrder("limit", LimitOrder(1, 100, 10, "buy", "BTC-USD"))
+    order_book.addOrder("limit", LimitOrder(2, 100, 10, "buy", "BTC-USD"))
+
+    amended = order_book.modifyOrder(1, 4)
+    assert amended is order_book.order_map[1]
+    assert order_book.bestOrder("buy").order_id == 1
+    assert order_book.getHeapStats()["dead_orders"] == 0
+
+    order_book.addOrder("market", MarketOrder(3, 6, "sell", "BTC-USD"))
+    trades = order_book.trade_manager.trades
+    assert [(t.buy_order_id, t.filled_quantity) for t in trades] == [(1, 4), (2, 2)]
+
+
+def test_modify_order_requeues_on_price_or_size_increase(order_book):
+    order_book.addOrder("limit", LimitOrder(1, 100, 10, "buy", "BTC-USD"))
+    order_book.addOrder("limit", LimitOrder(2, 100, 10, "buy", "BTC-USD"))
+    order_book.addOrder("limit", LimitOrder(3, 105, 5, "sell", "BTC-USD"))
+
+    order_book.modifyOrder(1, 12)
+    assert [o.order_id for o in order_book._firstOrders("buy", 2)] == [2, 1]
+
+    # Repricing through the ask trades at once
+    amended = order_book.modifyOrder(2, 8, 105)
+    assert amended.quantity == 3 and amended.price == 105
+    trade = order_book.trade_manager.trades[-1]
+    assert (trade.buy_order_id, trade.sell_order_id, trade.filled_quantity) == (2, 3, 5)
+
+    assert order_book.modifyOrder(2, 0) is None
+    assert order_book.modifyOrder(42, 1) is None
+    assert [o.order_id for o in order_book._firstOrders("buy", 5)] == [1]
+
+
+def test_modify_order_rejects_negative_quantity(order_book):
+    order_book.addOrder("limit", LimitOrder(1, 100, 10, "buy", "BTC-USD"))
+    with pytest.raises(ValueError):
+        order_book.modifyOrder(1, -5)
+    assert order_book.bestOrder("buy").quantity == 10
@@ -0,0 +1,57 @@
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.factory import OrderFactory
+from core.orders import LimitOrder, MarketOrder, CompactLimitOrder, CompactMarketOrder
+from core.trades import Trade, CompactTrade
+from services.trade_manager import TradeManager
+from core.orderbook import HeapOrderBook
+
+
+def test_orders_and_trades_have_no_instance_dict():
+    objects = [
+        LimitOrder(1, 100, 10, "buy", "BTC-USD"),
+        MarketOrder(2, 10, "sell", "BTC-USD"),
+        CompactLimitOrder(3, 100, 10, "buy", "BTC-USD"),
+        CompactMarketOrder(4, 10, "sell", "BTC-USD"),
+        Trade(1, 2, 100, 10, "BTC-USD"),
+        CompactTrade(1, 2, 100, 10, "BTC-USD"),
+    ]
+    for obj in objects:
+        assert not hasattr(obj, "__dict__")
+
+
+def test_compact_orders_use_sequence_and_interned_strings():
+    side = "".join(["s", "ell"])
+    first = CompactLimitOrder(1, 100, 10, side, "BTC-USD")
+    second = CompactLimitOrder(2, 100, 10, "".join(["s", "ell"]), "BTC-USD")
+
+    assert isinstance(first.timestamp, int)
+    assert first.timestamp < second.timestamp
+    assert first.order_side is second.order_side
+    assert first < second
+
+
+def test_compact_orders_through_factory_and_matching():
+    OrderFactory.register_order_type("compact_limit", CompactLimitOrder)
+    OrderFactory.register_order_type("compact_market", CompactMarketOrder)
+    strategies = {
+        "limit": LimitOrderMatching(trade_class=CompactTrade),
+        "market": MarketOrderMatching(trade_class=CompactTrade),
+    }
+    book = HeapOrderBook("BTC-USD", TradeManager(), strategies)
+
+    for order_id, price in ((1, 101), (2, 100), (3, 100)):
+        book.addOrder(
+            "limit",
+            OrderFactory.create_order(
+                "compact_limit", order_id=order_id, price=price, quantity=5, order_side="sell", asset="BTC-USD"
+            ),
+        )
+    book.addOrder(
+        "market",
+        OrderFactory.create_order("compact_market", order_id=4, quantity=12, order_side="buy", asset="BTC-USD"),
+    )
+
+    trades = book.trade_manager.trades
+    assert [(t.sell_order_id, t.filled_quantity) for t in trades] == [(2, 5), (3, 5), (1, 2)]
+    assert all(isinstance(t, CompactTrade) for t in trades)
+    assert trades[0].seq < trades[1].seq < trades[2].seq
@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+import random
+import pytest
+from services.replay import main, read_csv, replay, CSV_FIELDS
+from utils.histogram import LatencyHistogram
+
+
+def write_orders(path, count=500, seed=21):
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as orders_file:
+        writer = csv.writer(orders_file)
+        writer.writerow(CSV_FIELDS)
+        for order_id in range(1, count + 1):
+            asset = rng.choice(("BTC-USD", "ETH-USD"))
+            side = rng.choice(("buy", "sell"))
+            roll = rng.random()
+            if roll < 0.1:
+                writer.writerow(["market", order_id, side, "", rng.randint(1, 20), asset])
+            elif roll < 0.3:
+                writer.writerow(["cancel", rng.randint(1, order_id), "", "", "", asset])
+            else:
+                writer.writerow(["limit", order_id, side, rng.randint(190, 210) / 2, rng.randint(1, 10), asset])
+
+
+def test_replay_is_byte_identical(tmp_path):
+    orders = tmp_path / "orders.csv"
+    write_orders(orders)
+
+    stats = main([str(orders), "--trades", str(tmp_path / "first.csv"), "--report", str(tmp_path / "report.json")])
+    main([str(orders), "--trades", str(tmp_path / "second.csv")])
+
+    first = (tmp_path / "first.csv").read_bytes()
+    assert first == (tmp_path / "second.csv").read_bytes()
+    assert stats["orders"] == 500
+    assert stats["trades"] == first.count(b"\n") - 1 > 0
+    assert json.loads((tmp_path / "report.json").read_text())["match_latency_ns"]["count"] == 500
+
+
+def test_binary_input_gives_same_trades(tmp_path):
+    orders = tmp_path / "orders.csv"
+    write_orders(orders)
+    main([str(orders), "--to-binary", str(tmp_path / "orders.bin")])
+
+    main([str(orders), "--trades", str(tmp_path / "from_csv.csv")])
+    main([str(tmp_path / "orders.bin"), "--trades", str(tmp_path / "from_bin.csv"), "--book", "ladder"])
+
+    assert (tmp_path / "from_csv.csv").read_bytes() == (tmp_path / "from_bin.csv").read_bytes()
+
+
+def test_read_csv_is_lazy(tmp_path):
+    orders = tmp_path / "orders.csv"
+    write_orders(orders)
+    rows = read_csv(str(orders))
+    assert next(rows)[0] in ("limit", "market", "cancel")
+
+
+def test_unknown_order_type_is_rejected():
+    rows = [("limit", 1, "buy", 100, 5, "BTC-USD"), ("ioc", 2, "sell", 100, 5, "BTC-USD")]
+    with pytest.raises(ValueError):
+        replay(rows, io.StringIO())
+    with pytest.raises(ValueError):
+        replay(rows[1:], io.StringIO())
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for value in range(1, 10_001):
+        histogram.record(value)
+
+    assert abs(histogram.percentile(50) - 5_000) / 5_000 < 0.02
+    assert abs(histogram.percentile(99) - 9_900) / 9_900 < 0.02
+    assert histogram.percentile(100) == 10_000
+    assert histogram.summary()["count"] == 10_000
@@ -0,0 +1,74 @@
+import logging
+import random
+from core.engine import MatchingEngine
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orders import LimitOrder, MarketOrder
+from core.sharding import ShardedMatchingEngine, shard_of
+from services.trade_manager import TradeManager
+from utils.logger import logger
+
+
+def order_stream(count, assets, seed=3):
+    rng = random.Random(seed)
+    for order_id in range(1, count + 1):
+        asset = rng.choice(assets)
+        side = rng.choice(("buy", "sell"))
+        if rng.random() < 0.2:
+            yield "market", MarketOrder(order_id, rng.randint(1, 20), side, asset)
+        else:
+            yield "limit", LimitOrder(order_id, rng.randint(95, 105), rng.randint(1, 10), side, asset)
+
+
+def as_tuples(trades):
+    return [(t.buy_order_id, t.sell_order_id, t.execution_price, t.filled_quantity, t.asset) for t in trades]
+
+
+def test_sharded_trades_match_single_process():
+    assets = [f"SYM{index}" for index in range(8)]
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+
+    logger.setLevel(logging.WARNING)
+    try:
+        expected = MatchingEngine(TradeManager(), strategies).addOrders(order_stream(600, assets))
+    finally:
+        logger.setLevel(logging.INFO)
+
+    with ShardedMatchingEngine(3, TradeManager(), strategies, batch_size=50) as engine:
+        engine.addOrders(order_stream(600, assets))
+        trades = engine.drain()
+
+    assert trades
+    assert as_tuples(trades) == as_tuples(expected)
+    assert as_tuples(engine.trade_manager.trades) == as_tuples(expected)
+
+
+def test_cancel_routed_to_owning_shard():
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    with ShardedMatchingEngine(2, TradeManager(), strategies) as engine:
+        engine.addOrder("limit", LimitOrder(1, 100, 5, "sell", "BTC-USD"))
+        engine.removeOrder("BTC-USD", 1)
+        engine.addOrder("market", MarketOrder(2, 5, "buy", "BTC-USD"))
+        assert engine.drain() == []
+
+
+def test_shard_of_is_stable():
+    assert shard_of("BTC-USD", 4) == shard_of("BTC-USD", 4)
+    assert {shard_of(f"SYM{index}", 4) for index in range(50)} == {0, 1, 2, 3}
+
+
+def test_failing_order_is_rejected_and_the_shard_keeps_running():
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    logger.setLevel(logging.ERROR)
+    try:
+        with ShardedMatchingEngine(1, TradeManager(), strategies) as engine:
+            engine.addOrder("limit", LimitOrder(1, 100, 5, "sell", "BTC-USD"))
+            # Sweeps the ask, then has no bid to convert the rest at
+            engine.addOrder("market", MarketOrder(2, 8, "buy", "BTC-USD", partial_fill_behavior="convert_to_limit"))
+            engine.addOrder("limit", LimitOrder(3, 101, 5, "sell", "BTC-USD"))
+            engine.addOrder("market", MarketOrder(4, 2, "buy", "BTC-USD"))
+            trades = engine.drain()
+    finally:
+        logger.setLevel(logging.INFO)
+
+    assert as_tuples(trades) == [(2, 1, 100, 5, "BTC-USD"), (4, 3, 101, 2, "BTC-USD")]
+    assert [order_id for order_id, _ in engine.rejects] == [2]
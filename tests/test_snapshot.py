@@ -0,0 +1,101 @@
+import io
+import random
+import pytest
+from core.matching import LimitOrderMatching, MarketOrderMatching, StopOrderMatching
+from core.orders import LimitOrder, MarketOrder, StopOrder
+from core.orderbook import HeapOrderBook
+from core.snapshot import save_snapshot, load_snapshot
+from services.trade_manager import TradeManager
+
+
+def order_flow(count, seed=9):
+    rng = random.Random(seed)
+    flow = []
+    for order_id in range(1, count + 1):
+        side = rng.choice(("buy", "sell"))
+        roll = rng.random()
+        if roll < 0.1:
+            flow.append(("market", order_id, None, rng.randint(1, 20), side))
+        elif roll < 0.3:
+            flow.append(("cancel", rng.randint(1, order_id), None, None, None))
+        else:
+            flow.append(("limit", order_id, rng.randint(190, 210) / 2, rng.randint(1, 10), side))
+    return flow
+
+
+def replay(book, flow):
+    for order_type, order_id, price, quantity, side in flow:
+        if order_type == "cancel":
+            book.removeOrder(order_id)
+        elif order_type == "market":
+            book.addOrder("market", MarketOrder(order_id, quantity, side, "BTC-USD"))
+        else:
+            book.addOrder("limit", LimitOrder(order_id, price, quantity, side, "BTC-USD"))
+
+
+def book_state(book):
+    return {
+        side: [(o.order_id, o.price, o.quantity) for o in book._firstOrders(side, 10_000)]
+        for side in ("buy", "sell")
+    }
+
+
+def trade_tuples(book):
+    return [(t.buy_order_id, t.sell_order_id, t.execution_price, t.filled_quantity) for t in book.trade_manager.trades]
+
+
+@pytest.mark.parametrize("tick_size", [None, 0.5])
+def test_snapshot_then_replay_matches_full_replay(tick_size):
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    flow = order_flow(600)
+
+    full = HeapOrderBook("BTC-USD", TradeManager(), strategies, tick_size=tick_size)
+    replay(full, flow)
+
+    partial = HeapOrderBook("BTC-USD", TradeManager(), strategies, tick_size=tick_size)
+    replay(partial, flow[:300])
+    stream = io.BytesIO()
+    save_snapshot(partial, stream)
+    stream.seek(0)
+
+    restored = load_snapshot(stream, TradeManager(), strategies)
+    assert book_state(restored) == book_state(partial)
+    assert restored.trade_manager.trades == []
+
+    replay(restored, flow[300:])
+    assert book_state(restored) == book_state(full)
+    assert trade_tuples(restored) == trade_tuples(full)[len(trade_tuples(partial)):]
+
+
+def test_restore_rebuilds_depth_cache():
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    book = HeapOrderBook("BTC-USD", TradeManager(), strategies, depth_levels=3)
+    replay(book, order_flow(200))
+
+    stream = io.BytesIO()
+    save_snapshot(book, stream)
+    stream.seek(0)
+    restored = load_snapshot(stream, TradeManager(), strategies, depth_levels=3)
+
+    assert restored.getSnapshot()[1:] == book.getSnapshot()[1:]
+
+
+def test_rejects_other_data():
+    with pytest.raises(ValueError):
+        load_snapshot(io.BytesIO(b"\0" * 64), TradeManager(), {})
+
+
+def test_keeps_last_trade_price_and_refuses_pending_stops():
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching(), "stop": StopOrderMatching()}
+    book = HeapOrderBook("BTC-USD", TradeManager(), strategies)
+    book.addOrder("limit", LimitOrder(1, 100, 5, "sell", "BTC-USD"))
+    book.addOrder("market", MarketOrder(2, 2, "buy", "BTC-USD"))
+
+    stream = io.BytesIO()
+    save_snapshot(book, stream)
+    stream.seek(0)
+    assert load_snapshot(stream, TradeManager(), strategies).last_trade_price == 100
+
+    book.addOrder("stop", StopOrder(3, 110, 1, "buy", "BTC-USD"))
+    with pytest.raises(ValueError):
+        save_snapshot(book, io.BytesIO())
@@ -0,0 +1,96 @@
+import random
+import threading
+import time
+import pytest
+from core.interfaces import MatchingStrategy
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orderbook import HeapOrderBook
+from core.orders import LimitOrder, MarketOrder
+from core.threaded import ThreadedOrderBook
+from services.trade_manager import DiscardTradeManager
+
+
+def strategies():
+    return {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+
+
+def make_orders(count=1000, seed=8):
+    rng = random.Random(seed)
+    orders = []
+    for order_id in range(1, count + 1):
+        side = rng.choice(("buy", "sell"))
+        if rng.random() < 0.1:
+            orders.append(("market", MarketOrder(order_id, rng.randint(1, 20), side, "BTC-USD")))
+        else:
+            orders.append(("limit", LimitOrder(order_id, rng.randint(95, 105), rng.randint(1, 10), side, "BTC-USD")))
+    return orders
+
+
+def test_readers_only_see_published_consistent_books():
+    seen = []
+    stop = threading.Event()
+
+    def read():
+        last_version = -1
+        while not stop.is_set():
+            snapshot = book.getSnapshot()
+            assert snapshot.version >= last_version
+            last_version = snapshot.version
+            # A snapshot is taken between commands, never with the book crossed mid match
+            if snapshot.bids and snapshot.asks:
+                assert snapshot.bids[0][0] < snapshot.asks[0][0]
+            seen.append(snapshot.version)
+            time.sleep(0)
+
+    with ThreadedOrderBook("BTC-USD", DiscardTradeManager(), strategies(), depth_levels=5) as book:
+        readers = [threading.Thread(target=read) for _ in range(2)]
+        for reader in readers:
+            reader.start()
+        for order_type, order in make_orders():
+            book.addOrder(order_type, order)
+        book.flush()
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+        reference = HeapOrderBook("BTC-USD", DiscardTradeManager(), strategies(), depth_levels=5)
+        for order_type, order in make_orders():
+            reference.addOrder(order_type, order)
+        assert book.getSnapshot() == reference.getSnapshot()
+        assert book.getBid() == reference.getSnapshot().bids[0][0]
+        assert book.listAsk(2) == reference.getSnapshot().asks[:2]
+    assert seen
+
+
+def test_cancel_modify_and_rejects_go_through_the_matcher():
+    with ThreadedOrderBook("BTC-USD", DiscardTradeManager(), strategies()) as book:
+        book.addOrder("limit", LimitOrder(1, 100, 5, "buy", "BTC-USD"))
+        book.addOrder("limit", LimitOrder(2, 99, 5, "buy", "BTC-USD"))
+        book.addOrder("limit", LimitOrder(3, 99, 5, "buy", "ETH-USD"))  # Rejected, logged
+        book.modifyOrder(2, 2)
+        book.removeOrder(1)
+        book.flush()
+        assert book.getSnapshot().bids == ((99, 2, 1),)
+        assert book.getAsk() is None
+    assert not book.thread.is_alive()
+
+
+class FailingMatching(MatchingStrategy):
+    def match(self, orderbook, new_order):
+        raise ZeroDivisionError("broken strategy")
+
+
+def test_failing_commands_are_logged_and_a_stopped_matcher_raises():
+    book = ThreadedOrderBook("BTC-USD", DiscardTradeManager(), {**strategies(), "broken": FailingMatching()})
+    book.addOrder("limit", LimitOrder(1, "100", 5, "buy", "BTC-USD"))  # Rejected before it rests
+    book.addOrder("broken", MarketOrder(2, 5, "sell", "BTC-USD"))
+    book.addOrder("limit", LimitOrder(4, 99, 5, "buy", "BTC-USD"))
+    book.flush()
+    assert book.thread.is_alive()
+    assert book.getSnapshot().bids == ((99, 5, 1),)
+
+    book.close()
+    with pytest.raises(RuntimeError):
+        book.flush()
+    with pytest.raises(RuntimeError):
+        book.addOrder("limit", LimitOrder(4, 99, 5, "buy", "BTC-USD"))
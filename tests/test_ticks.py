@@ -0,0 +1,59 @@
+import pytest
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orders import LimitOrder, MarketOrder
+from core.ticks import PriceGrid
+from services.trade_manager import TradeManager
+from core.orderbook import HeapOrderBook
+from core.ladder import LadderOrderBook
+
+
+def make_book(book_class, **kwargs):
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    return book_class("BTC-USD", TradeManager(), strategies, **kwargs)
+
+
+def test_price_grid_conversions():
+    grid = PriceGrid(tick_size=0.01, lot_size=5)
+
+    assert grid.to_ticks(100.07) == 10007
+    assert grid.to_price(10007) == 100.07
+    assert grid.average_price(3 * 10010 + 7 * 10020, 10) == 100.17
+    with pytest.raises(ValueError):
+        grid.to_ticks(100.075)
+    with pytest.raises(ValueError):
+        grid.check_quantity(7)
+
+
+def test_price_grid_without_tick_size_is_identity():
+    grid = PriceGrid()
+
+    assert grid.to_ticks(23.5) == 23.5
+    with pytest.raises(ValueError):
+        grid.to_ticks("23.5")
+    assert grid.average_price(47, 2) == 23.5
+
+
+@pytest.mark.parametrize("book_class", [HeapOrderBook, LadderOrderBook])
+def test_book_matches_on_ticks_and_reports_prices(book_class):
+    book = make_book(book_class, tick_size=0.1)
+    book.addOrder("limit", LimitOrder(1, 100.2, 7, "sell", "BTC-USD"))
+    book.addOrder("limit", LimitOrder(2, 100.1, 3, "sell", "BTC-USD"))
+
+    assert book.bestOrder("sell").price_ticks == 1001
+    assert book.getAsk() == 100.1
+
+    avg_price = book.strategies["market"].match(book, MarketOrder(3, 10, "buy", "BTC-USD"))
+
+    # Float sums give 100.16999999999999
+    assert avg_price == 100.17
+    assert [t.execution_price for t in book.trade_manager.trades] == [100.1, 100.2]
+
+
+@pytest.mark.parametrize("book_class", [HeapOrderBook, LadderOrderBook])
+def test_book_rejects_off_grid_orders(book_class):
+    book = make_book(book_class, tick_size=0.5, lot_size=10)
+
+    with pytest.raises(ValueError):
+        book.addOrder("limit", LimitOrder(1, 100.25, 10, "buy", "BTC-USD"))
+    with pytest.raises(ValueError):
+        book.addOrder("market", MarketOrder(2, 15, "buy", "BTC-USD"))
@@ -0,0 +1,55 @@
+import pytest
+from core.matching import LimitOrderMatching, MarketOrderMatching
+from core.orders import LimitOrder, MarketOrder
+from core.trades import Trade
+from core.orderbook import HeapOrderBook
+from services.trade_journal import TradeJournal, TradeJournalReader
+
+
+def test_journal_rotates_segments_and_reads_back(tmp_path):
+    with TradeJournal(str(tmp_path), segment_records=4, flush_every=3) as journal:
+        for index in range(10):
+            journal.record_trade(Trade(index, index + 100, 100.0 + index, index + 1, "BTC-USD"))
+
+    assert len(list(tmp_path.iterdir())) == 3
+
+    with TradeJournalReader(str(tmp_path)) as reader:
+        assert len(reader) == 10
+        assert [record.seq for record in reader] == list(range(1, 11))
+        assert reader[5].buy_order_id == 5
+        assert reader[-1].price == 109.0
+        assert [record.quantity for record in reader[3:6]] == [4, 5, 6]
+        assert reader[0].asset == "BTC-USD"
+
+
+def test_reopened_journal_appends_after_last_record(tmp_path):
+    with TradeJournal(str(tmp_path), segment_records=4) as journal:
+        for index in range(6):
+            journal.record(index, index, 10.0, 1, "ETH-USD")
+    with TradeJournal(str(tmp_path), segment_records=4) as journal:
+        journal.record(99, 98, 11.0, 2, "ETH-USD")
+
+    with TradeJournalReader(str(tmp_path)) as reader:
+        assert len(reader) == 7
+        assert reader[6].seq == 7
+        assert reader[6].buy_order_id == 99
+
+
+def test_book_writes_trades_to_journal(tmp_path):
+    strategies = {"limit": LimitOrderMatching(), "market": MarketOrderMatching()}
+    with TradeJournal(str(tmp_path)) as journal:
+        book = HeapOrderBook("BTC-USD", journal, strategies)
+        book.addOrder("limit", LimitOrder(1, 100, 5, "sell", "BTC-USD"))
+        book.addOrder("market", MarketOrder(2, 3, "buy", "BTC-USD"))
+
+    with TradeJournalReader(str(tmp_path)) as reader:
+        trades = list(reader.trades())
+    assert [(t.buy_order_id, t.sell_order_id, t.execution_price, t.filled_quantity) for t in trades] == [
+        (2, 1, 100.0, 3)
+    ]
+
+
+def test_asset_too_long(tmp_path):
+    with TradeJournal(str(tmp_path)) as journal:
+        with pytest.raises(ValueError):
+            journal.record(1, 2, 1.0, 1, "A" * 17)
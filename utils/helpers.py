@@ -1,4 +1,6 @@
+import logging
 from utils.logger import logger
 
 def print_line(length=80):
-    logger.info("_" * length)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("_" * length)
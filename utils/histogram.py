@@ -0,0 +1,80 @@
+from array import array
+from math import ceil
+
+
+class LatencyHistogram:
+    """Fixed memory log-linear histogram of non negative ints (e.g. latencies in ns).
+
+    Like an HDR histogram: every power of two range is split into
+    2 ** (precision_bits - 1) buckets, so recorded values keep a relative
+    precision of about 2 ** -(precision_bits - 1) whatever their magnitude,
+    and memory does not grow with the number of values.
+    """
+
+    def __init__(self, precision_bits: int = 7):
+        self.precision_bits = precision_bits
+        self.counts = array("q", bytes(8 * ((65 - precision_bits) << (precision_bits - 1))))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        shift = value.bit_length() - self.precision_bits
+        if shift <= 0:
+            return value
+        return (shift << (self.precision_bits - 1)) + (value >> shift)
+
+    def _lowest(self, index):
+        """Smallest value falling in a bucket"""
+        if index < 1 << self.precision_bits:
+            return index
+        shift = (index >> (self.precision_bits - 1)) - 1
+        return (index - (shift << (self.precision_bits - 1))) << shift
+
+    def record(self, value: int):
+        # _index inlined, this runs once per timed section
+        shift = value.bit_length() - self.precision_bits
+        self.counts[value if shift <= 0 else (shift << (self.precision_bits - 1)) + (value >> shift)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float):
+        """Highest value equivalent to the given percentile (0 when empty)"""
+        if not self.count:
+            return 0
+        target = max(1, ceil(self.count * percent / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._lowest(index + 1) - 1, self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "min": self.min or 0,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "p99.9": self.percentile(99.9),
+            "max": self.max,
+        }
@@ -1,19 +1,175 @@
+import atexit
 import logging
+import os
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-now = datetime.now().strftime("%d-%m-%Y_%H:%M:%S")
-log_file_name = "orderbook_log_(" + now + ").txt"
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+LOG_DATE_FORMAT = "%H:%M:%S"
+LOG_DIR = "logs"
 
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
 
-logging.basicConfig(
-    level = logging.INFO,
-    format = "%(asctime)s [%(levelname)s] %(message)s",
-    datefmt= "%H:%M:%S",
-    handlers=[
-        logging.FileHandler("logs/"+ log_file_name),   # write to the file
-        logging.StreamHandler()               # Show up in terminal also
-    ]
-)
+LOG_MODES = ("sync", "queue")
 
-logger = logging.getLogger(__name__)
-    
\ No newline at end of file
+_queue_listener = None
+_installed_handlers = []
+
+
+def timestamped_log_file(log_dir=LOG_DIR):
+    now = datetime.now().strftime("%d-%m-%Y_%H:%M:%S")
+    return os.path.join(log_dir, "orderbook_log_(" + now + ").txt")
+
+
+def configure_logging(
+    log_file: str | None = "timestamped",
+    level=logging.INFO,
+    stream: bool = True,
+    max_bytes: int = 0,
+    backup_count: int = 0,
+):
+    """Install the orderbook log handlers on the root logger.
+
+    log_file is "timestamped" for a new file per run in logs/, None for no
+    file, or a path shared between runs (opened in append mode). With
+    max_bytes set the file rotates, keeping backup_count old files. Calling
+    it again replaces the handlers installed by the previous call.
+    """
+    queued = _queue_listener is not None
+    disable_queue_logging()
+
+    root = logging.getLogger()
+    for handler in _installed_handlers:
+        root.removeHandler(handler)
+        handler.close()
+    _installed_handlers.clear()
+
+    if log_file == "timestamped":
+        log_file = timestamped_log_file()
+    if log_file is not None:
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        if max_bytes:
+            _installed_handlers.append(
+                RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+            )
+        else:
+            _installed_handlers.append(logging.FileHandler(log_file))  # write to the file
+    if stream:
+        _installed_handlers.append(logging.StreamHandler())  # Show up in terminal also
+
+    formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+    for handler in _installed_handlers:
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    root.setLevel(level)
+    logger.setLevel(level)
+    logger.removeHandler(_first_use_handler)
+
+    if queued:
+        enable_queue_logging()
+
+
+class _FirstUseHandler(logging.Handler):
+    """Sets up the default handlers the first time a record is logged.
+
+    It sits on our logger and runs before the record propagates to the root,
+    so the record that triggered the setup is written by the new handlers.
+    An application that already configured the root logger is left alone.
+    """
+
+    def emit(self, record):
+        logger.removeHandler(self)
+        # Behind queue logging the handlers sit on the listener, the root only has the queue handler
+        handlers = [
+            handler for handler in logging.getLogger().handlers if not isinstance(handler, _DeferredQueueHandler)
+        ]
+        if _queue_listener is not None:
+            handlers.extend(_queue_listener.handlers)
+        if not handlers:
+            # Keep a level set on our logger before anything was logged
+            configure_logging(level=logger.level)
+
+
+_first_use_handler = _FirstUseHandler()
+logger.addHandler(_first_use_handler)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    Only the message arguments are resolved on the caller, since orders keep
+    changing after they are logged; timestamps, layout and I/O happen later.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def enable_queue_logging():
+    """Move the root handlers behind a QueueListener so callers only enqueue records"""
+    global _queue_listener
+    if _queue_listener is not None:
+        return _queue_listener
+
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    log_queue = queue.SimpleQueue()
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+    return _queue_listener
+
+
+def disable_queue_logging():
+    """Flush pending records and give the handlers back to the root logger"""
+    global _queue_listener
+    if _queue_listener is None:
+        return
+
+    listener, _queue_listener = _queue_listener, None
+    listener.stop()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, _DeferredQueueHandler):
+            root.removeHandler(handler)
+    for handler in listener.handlers:
+        root.addHandler(handler)
+
+
+def set_log_mode(log_mode: str):
+    """Select how records are written: "sync" on the caller, or "queue" on a background thread.
+
+    The mode is process wide, for every book and component at once.
+    """
+    if log_mode not in LOG_MODES:
+        raise ValueError(f"Log mode: '{log_mode}' not supported, use one of {LOG_MODES}")
+    if log_mode == "queue":
+        enable_queue_logging()
+    else:
+        disable_queue_logging()
+
+
+def request_log_mode(log_mode: str):
+    """Log mode asked for by one component, which may turn queue logging on but never off.
+
+    "sync" is the default, so asking for it changes nothing and a book built
+    with it can't undo the queue another book, or the application, set up;
+    use set_log_mode to switch back.
+    """
+    if log_mode not in LOG_MODES:
+        raise ValueError(f"Log mode: '{log_mode}' not supported, use one of {LOG_MODES}")
+    if log_mode == "queue":
+        enable_queue_logging()
+
+
+atexit.register(disable_queue_logging)
@@ -0,0 +1,58 @@
+from time import perf_counter_ns
+from utils.histogram import LatencyHistogram
+
+clock = perf_counter_ns  # Monotonic ns clock shared by the timed sections
+
+
+class BookMetrics:
+    """Latency histograms and counters filled in by an order book.
+
+    Timers, all in ns from perf_counter_ns:
+        order   one addOrder, from validation to the end of matching
+        match   the matching strategy alone
+        trade   handing one trade to the trade manager
+        cancel  one removeOrder of a resting order
+    Books only touch it when created with metrics=..., so a book without it
+    pays one None check per call. One instance can be shared by every book
+    of an engine to get totals over all assets.
+    """
+
+    TIMERS = ("order", "match", "trade", "cancel")
+
+    def __init__(self, precision_bits: int = 7):
+        self.precision_bits = precision_bits
+        self.reset()
+
+    def reset(self):
+        self.timers = {name: LatencyHistogram(self.precision_bits) for name in self.TIMERS}
+        self.trades_per_order = LatencyHistogram(self.precision_bits)
+        self.cancel_misses = 0  # Cancels of ids no longer resting
+
+    def record(self, timer: str, elapsed_ns: int):
+        self.timers[timer].record(elapsed_ns)
+
+    def stats(self, **gauges):
+        """Counters and timer summaries as a dict, with the book's current gauges (depth, tombstones)"""
+        return {
+            "orders": self.timers["order"].count,
+            "trades": self.timers["trade"].count,
+            "cancels": self.timers["cancel"].count,
+            "cancel_misses": self.cancel_misses,
+            "trades_per_order": self.trades_per_order.summary(),
+            "timers_ns": {name: timer.summary() for name, timer in self.timers.items()},
+            **gauges,
+        }
+
+    def dump(self, **gauges):
+        """Stats as an aligned text table"""
+        stats = self.stats(**gauges)
+        lines = [f"{'timer':<8}{'count':>10}{'mean':>10}{'p50':>10}{'p99':>10}{'p99.9':>10}{'max':>10}"]
+        for name, summary in stats.pop("timers_ns").items():
+            lines.append(
+                f"{name:<8}{summary['count']:>10}{summary['mean']:>10.0f}{summary['p50']:>10}"
+                f"{summary['p99']:>10}{summary['p99.9']:>10}{summary['max']:>10}"
+            )
+        per_order = stats.pop("trades_per_order")
+        lines.append(f"trades per order: mean {per_order['mean']:.2f}, p99 {per_order['p99']}, max {per_order['max']}")
+        lines.extend(f"{name}: {value}" for name, value in stats.items())
+        return "\n".join(lines)